@@ -0,0 +1,203 @@
+"""
+Bulk re-verification against a local OpenAI-compatible batch endpoint
+
+    python benchmarks/fake_batch.py --claims 20 --fail-rate 0.2 --expire 1
+    python benchmarks/fake_batch.py --serve   # then reverify.py --base-url <printed url>
+
+Serves the Files and Batches endpoints, Serper-style search and the pages it
+links to from a local server with canned model replies, and runs a BulkJob
+through OpenAIBatchBackend. --fail-rate answers that share of batch
+requests with a 500, --expire ends the first batches as expired without
+output. Claims whose replies keep failing are retried up to
+CLAIMCHECK_BATCH_MAX_ATTEMPTS times, then end as failed and are never
+written.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import collections
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+PAGE = b"<html><body><article><p>NASA records that Apollo 11 landed on the moon in July 1969.</p></article></body></html>"
+
+
+def reply(prompt: str) -> str:
+    """Canned answer for each ClaimCheck prompt"""
+    if "Your Summary" in prompt:
+        return "NASA records that Apollo 11 landed on the moon in 1969."
+    if "Your Analysis" in prompt:
+        return "The evidence answers the claim.\nNONE"
+    if "Judgement" in prompt:
+        return "The sources agree. `Supported`"
+    return '```\nweb_search("apollo 11 moon landing")\n```'
+
+
+class BatchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    files = {}
+    batches = {}
+    fail_rate = 0.0
+    expire = 0
+    counts = collections.Counter()
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str = "application/json", status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _store(self, content: bytes) -> str:
+        with self.lock:
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = content
+        return file_id
+
+    def _batch(self, batch: dict) -> bytes:
+        return json.dumps({
+            "id": batch["id"], "object": "batch", "endpoint": "/v1/chat/completions",
+            "input_file_id": batch["input"], "completion_window": "24h", "created_at": 0,
+            "status": batch["status"], "output_file_id": batch["output"],
+            "request_counts": {"total": batch["total"], "completed": batch["completed"], "failed": batch["failed"]},
+        }).encode()
+
+    def _run_batch(self, input_file_id: str) -> dict:
+        lines = [json.loads(line) for line in self.files[input_file_id].decode().splitlines() if line.strip()]
+        batch_id = f"batch-{len(self.batches)}"
+        batch = {"id": batch_id, "input": input_file_id, "status": "in_progress", "output": None,
+                 "total": len(lines), "completed": 0, "failed": 0, "polls": 0}
+        self.counts["batches"] += 1
+        self.counts["requests"] += len(lines)
+        if len(self.batches) < self.expire:
+            batch["final"] = "expired"
+            self.counts["expired"] += 1
+        else:
+            output = []
+            for item in lines:
+                body = item["body"]
+                if random.random() < self.fail_rate:
+                    response = {"status_code": 500, "body": {"error": {"message": "server error"}}}
+                    batch["failed"] += 1
+                else:
+                    if body.get("response_format"):
+                        content = json.dumps({"summary": "s", "reasoning": "r", "verdict": "Supported"})
+                    else:
+                        content = reply(body["messages"][-1]["content"])
+                    response = {"status_code": 200, "body": {
+                        "model": body["model"], "choices": [{"message": {"content": content}}],
+                        "usage": {"prompt_tokens": 1000, "completion_tokens": 50},
+                    }}
+                    batch["completed"] += 1
+                output.append(json.dumps({"custom_id": item["custom_id"], "response": response, "error": None}))
+            self.counts["failed requests"] += batch["failed"]
+            batch["final"] = "completed"
+            batch["output_file"] = self._store("\n".join(output).encode())
+        self.batches[batch_id] = batch
+        return batch
+
+    def do_GET(self):
+        if self.path.startswith("/v1/batches/"):
+            batch = self.batches[self.path.rsplit("/", 1)[1]]
+            batch["polls"] += 1
+            if batch["polls"] > 1:  # Runs until its second poll
+                batch["status"] = batch["final"]
+                batch["output"] = batch.get("output_file")
+            return self._send(self._batch(batch))
+        if self.path.startswith("/v1/files/") and self.path.endswith("/content"):
+            return self._send(self.files[self.path.split("/")[3]], "application/octet-stream")
+        if self.path.startswith("/page"):
+            return self._send(PAGE, "text/html; charset=utf-8")
+        self._send(b"{}", status=404)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/v1/files":
+            boundary = self.headers["Content-Type"].split("boundary=")[1].encode()
+            part = next(part for part in body.split(b"--" + boundary) if b'name="file"' in part)
+            content = part.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n", 1)[0]
+            file_id = self._store(content)
+            return self._send(json.dumps({
+                "id": file_id, "object": "file", "bytes": len(content), "created_at": 0,
+                "filename": "batch.jsonl", "purpose": "batch", "status": "processed",
+            }).encode())
+        if self.path == "/v1/batches":
+            batch = self._run_batch(json.loads(body)["input_file_id"])
+            return self._send(self._batch(batch))
+        if self.path == "/search":
+            base = f"http://127.0.0.1:{self.server.server_port}"
+
+            def results(query):
+                slug = query["q"].replace(" ", "_")
+                return {"organic": [{"link": f"{base}/page/{slug}/{n}", "snippet": query["q"]} for n in range(2)]}
+
+            queries = json.loads(body)
+            payload = [results(query) for query in queries] if isinstance(queries, list) else results(queries)
+            return self._send(json.dumps(payload).encode())
+        self._send(b"{}", status=404)
+
+
+def start_server() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BatchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=20)
+    parser.add_argument("--fail-rate", type=float, default=0.2, help="Share of batch requests answered with a 500")
+    parser.add_argument("--expire", type=int, default=1, help="Batches that expire without output")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--serve", action="store_true", help="Only run the server")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    BatchHandler.fail_rate, BatchHandler.expire = args.fail_rate, args.expire
+    base = start_server()
+    if args.serve:
+        print(f"Batch endpoint {base}/v1, search {base}/search")
+        while True:
+            time.sleep(3600)
+
+    # Before claimcheck reads its configuration
+    os.environ.setdefault("OPENAI_API_KEY", "local")
+    os.environ.setdefault("SERPER_API_KEY", "local")
+    os.environ["USE_OPENAI"] = "true"
+    os.environ["CLAIMCHECK_BATCH_POLL_SECONDS"] = "0.05"
+    from claimcheck import web_tools
+    from claimcheck.bulk import BulkJob, OpenAIBatchBackend
+    from claimcheck.config import BATCH_MAX_ATTEMPTS
+    web_tools.SERPER_URL = f"{base}/search"
+
+    job = BulkJob(os.path.join(tempfile.mkdtemp(), "job.db"), OpenAIBatchBackend(base_url=f"{base}/v1"))
+    job.add_claims((f"claim-{n}", f"Apollo 11 landed on the moon in 1969 (claim {n})") for n in range(args.claims))
+
+    written = {}
+    started = time.perf_counter()
+    counts = job.run(lambda claim_id, result: written.setdefault(claim_id, result) is not None)
+    failed = [claim_id for claim_id, entry in job.entries.items() if entry["stage"] == "failed"]
+
+    print(f"{args.claims} claims, fail rate {args.fail_rate}, {args.expire} expired batches, "
+          f"{BATCH_MAX_ATTEMPTS} attempts per stage: {time.perf_counter() - started:.1f} s")
+    print(f"  server: {dict(BatchHandler.counts)}")
+    print(f"  stages: {counts}")
+    print(f"  written: {len(written)}, failed: {len(failed)}, failed but written: {len(set(failed) & set(written))}")
+    for claim_id in failed:
+        print(f"    {claim_id}: {job.entries[claim_id]['error']}")
+
+
+if __name__ == "__main__":
+    main()
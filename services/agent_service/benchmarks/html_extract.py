@@ -0,0 +1,108 @@
+"""
+Page text extraction: throughput and quality of the claimcheck.extraction backends
+
+    python benchmarks/html_extract.py --repeat 50 --threads 8
+
+Runs every backend over the pages in benchmarks/html_corpus, where each
+<name>.html comes with <name>.txt holding the article text a reader would
+keep. The pages are synthetic: hand-written news, reference, blog,
+table-layout, fact-check, government, ASP.NET WebForms and themed layouts
+with menus, consent banners, scripts and footers. They were written with
+the lxml heuristics in mind, so the scores check those heuristics and catch
+regressions; they are not a measure of quality on real pages. Quality is
+word-level precision (share of extracted words that belong to the article;
+low means boilerplate got through) and recall (share of the article that
+was kept). Throughput is measured sequentially and from a thread pool, the
+way scrapes run in scheduler.executor.
+"""
+import os
+import sys
+import time
+import argparse
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+from claimcheck.extraction import EXTRACTORS, get_extractor
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'html_corpus')
+
+
+def load_corpus(directory: str):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            html = f.read()
+        with open(os.path.join(directory, name[:-5] + ".txt")) as f:
+            gold = f.read()
+        pages.append((name[:-5], html, gold))
+    return pages
+
+
+def words(text: str) -> collections.Counter:
+    return collections.Counter(word.strip(".,:;!?\"'()").lower() for word in text.split())
+
+
+def score(extracted: str, gold: str):
+    got, want = words(extracted), words(gold)
+    overlap = sum((got & want).values())
+    precision = overlap / sum(got.values()) if got else 0.0
+    recall = overlap / sum(want.values()) if want else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def throughput(extractor, pages, repeat: int, threads: int) -> float:
+    """Pages per second"""
+    documents = [html for _, html, _ in pages] * repeat
+    started = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(extractor.extract, documents))
+    else:
+        for html in documents:
+            extractor.extract(html)
+    return len(documents) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the corpus per throughput run")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--show", action="store_true", help="Print each backend's text per page")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    size = sum(len(html) for _, html, _ in pages)
+    print(f"{len(pages)} pages, {size / 1024:.0f} KB\n")
+
+    for name in EXTRACTORS:
+        extractor = get_extractor(name)
+        if extractor.name != name:
+            print(f"{name}: not installed, skipped\n")
+            continue
+
+        print(f"{name}")
+        totals = []
+        for page, html, gold in pages:
+            text = extractor.extract(html)
+            precision, recall, f1 = score(text, gold)
+            totals.append((precision, recall, f1))
+            print(f"  {page:<18} precision {precision:5.2f}   recall {recall:5.2f}   f1 {f1:5.2f}   {len(text):6d} chars")
+            if args.show:
+                print(f"    {text}")
+        means = [sum(column) / len(totals) for column in zip(*totals)]
+        print(f"  {'mean':<18} precision {means[0]:5.2f}   recall {means[1]:5.2f}   f1 {means[2]:5.2f}")
+
+        sequential = throughput(extractor, pages, args.repeat, 1)
+        pooled = throughput(extractor, pages, args.repeat, args.threads)
+        print(f"  {sequential:8.0f} pages/s ({sequential * size / len(pages) / 1024 / 1024:6.1f} MB/s) sequential, "
+              f"{pooled:8.0f} pages/s with {args.threads} threads\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Page fetch latency: a new connection per request vs the pooled clients in claimcheck.fetching
+
+    python benchmarks/http_pool.py --requests 200 --tls
+
+Serves a small page from a local HTTP(S) server and times concurrent
+fetches with an httpx.AsyncClient per request vs the shared per-loop
+client. --tls needs the openssl CLI and shows the saved handshakes.
+"""
+import os
+import sys
+import ssl
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+PAGE = b"<html><body><article><p>" + b"The moon landing happened in 1969. " * 100 + b"</p></article></body></html>"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+
+def start_server(tls: bool) -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    scheme = "http"
+    if tls:
+        directory = tempfile.mkdtemp()
+        cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+        subprocess.run([
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", key, "-out", cert
+        ], check=True, capture_output=True)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        # Trust the certificate in httpx
+        os.environ["SSL_CERT_FILE"] = cert
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"{scheme}://127.0.0.1:{server.server_port}/page"
+
+
+def report(name: str, latencies: list, wall: float):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{name:<34} mean {statistics.mean(ordered) * 1000:7.2f} ms   "
+          f"p50 {ordered[len(ordered) // 2] * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms   "
+          f"total {wall:6.2f} s")
+
+
+async def timed_async(fetch, url: str, count: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await fetch(url)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    return latencies, time.perf_counter() - started
+
+
+async def fresh_client_get(url: str):
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        return await client.get(url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+
+    url = start_server(args.tls)
+
+    # Imported after start_server so clients pick up the benchmark certificate
+    global httpx
+    import httpx
+    from claimcheck.fetching import _asend
+    from claimcheck.scheduler import scheduler
+
+    print(f"{args.requests} fetches of {len(PAGE)} bytes from {url}\n")
+    report("async client per request (before)", *scheduler.run(
+        timed_async(fresh_client_get, url, args.requests, args.concurrency)))
+    report("async shared client (after)", *scheduler.run(
+        timed_async(lambda u: _asend("scrape", "GET", u), url, args.requests, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 """Database module for Veris Agent Service"""
 
 from .client import db_client
-from .operations import save_verified_claim
+from .operations import (
+    save_verified_claim, fetch_recent_verdicts,
+    fetch_claims_for_reverification, update_claim_verification
+)
 
-__all__ = ['db_client', 'save_verified_claim']
+__all__ = [
+    'db_client', 'save_verified_claim', 'fetch_recent_verdicts',
+    'fetch_claims_for_reverification', 'update_claim_verification'
+]
@@ -3,7 +3,7 @@ import json
 import hashlib
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from .client import db_client
 
 logger = logging.getLogger(__name__)
@@ -127,3 +127,96 @@ def save_verified_claim(
             "success": False,
             "message": f"Exception: {str(e)}"
         }
+
+
+def fetch_recent_verdicts(since: datetime) -> List[Dict[str, Any]]:
+    """
+    Fetch verified claims updated since the given UTC time
+
+    Used to reuse verdicts for near-duplicate claims. "unverifiable" rows are
+    skipped because a re-check may find evidence that was missing before.
+    """
+    result = db_client.query(
+        """
+            SELECT claim, verification_status, confidence, evidence,
+                   verification_sources, updated_at
+            FROM crawled_content
+            WHERE updated_at >= %s
+              AND verification_status IS NOT NULL
+              AND verification_status <> 'unverifiable'
+            ORDER BY updated_at DESC
+        """,
+        (since,)
+    )
+
+    if "error" in result:
+        logger.error(f"Database error: {result['error']}")
+        return []
+    return result.get("rows", [])
+
+
+def fetch_claims_for_reverification(
+    limit: int,
+    updated_before: Optional[datetime] = None,
+    statuses: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fetch stored claims to re-verify, least recently checked first
+
+    Args:
+        limit: Maximum number of claims
+        updated_before: Only claims last updated before this UTC time
+        statuses: Only claims with one of these verification statuses
+    """
+    result = db_client.query(
+        """
+            SELECT id, claim, verification_status, updated_at
+            FROM crawled_content
+            WHERE claim IS NOT NULL
+              AND (%s::timestamp IS NULL OR updated_at < %s)
+              AND (%s::text[] IS NULL OR verification_status = ANY(%s))
+            ORDER BY updated_at ASC
+            LIMIT %s
+        """,
+        (updated_before, updated_before, statuses, statuses, limit)
+    )
+
+    if "error" in result:
+        logger.error(f"Database error: {result['error']}")
+        return []
+    return result.get("rows", [])
+
+
+def update_claim_verification(
+    claim_id: str,
+    verification_status: str,
+    confidence: int,
+    evidence: str,
+    sources: List[str]
+) -> Dict[str, Any]:
+    """
+    Replace the verdict of a stored claim, leaving its content untouched
+
+    Returns:
+        dict: Success status and message
+    """
+    result = db_client.query(
+        """
+            UPDATE crawled_content
+            SET verification_status = %s,
+                confidence = %s,
+                evidence = %s,
+                verification_sources = %s::jsonb,
+                updated_at = %s
+            WHERE id = %s
+        """,
+        (verification_status, confidence, evidence, json.dumps(sources or []),
+         datetime.utcnow().isoformat(), claim_id)
+    )
+
+    if "error" in result:
+        logger.error(f"Database error: {result['error']}")
+        return {"success": False, "message": f"Failed to update: {result['error']}"}
+    if not result.get("rowcount"):
+        return {"success": False, "message": f"Claim {claim_id} not found"}
+    return {"success": True, "message": "Verdict updated", "claim_id": claim_id}
@@ -0,0 +1,84 @@
+"""
+Bulk re-verification of stored claims through provider batch APIs
+
+    python reverify.py --job reverify.db --limit 5000 --older-than-days 30
+
+Claims are read from crawled_content, verified stage by stage in provider
+batches and their new verdicts written back. Running the same command with
+the same --job resumes it; claims are only selected when the job is new.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()  # Before claimcheck reads its configuration
+
+from database import db_client, fetch_claims_for_reverification, update_claim_verification
+
+tools_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools')
+if tools_path not in sys.path:
+    sys.path.insert(0, tools_path)
+
+from claimcheck import stage_stats
+from claimcheck.bulk import BulkJob, OpenAIBatchBackend, InlineBackend
+from claimcheck.config import USE_OPENAI, OPENAI_API_KEY
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Re-verify stored claims through provider batch APIs")
+    parser.add_argument("--job", default="reverify.db", help="Local job state file (resumes if it exists)")
+    parser.add_argument("--limit", type=int, default=1000, help="Claims to select for a new job")
+    parser.add_argument("--older-than-days", type=float, default=0, help="Only claims not updated for this long")
+    parser.add_argument("--status", action="append", help="Only claims with this verification status (repeatable)")
+    parser.add_argument("--date", help="Search date (DD-MM-YYYY) for a new job, defaults to today")
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL"), help="OpenAI-compatible batch endpoint")
+    parser.add_argument("--inline", action="store_true", help="Call the provider directly instead of its batch API")
+    parser.add_argument("--no-write", action="store_true", help="Keep new verdicts in the job file only")
+    return parser.parse_args()
+
+
+def write_verdict(claim_id: str, result: dict) -> bool:
+    saved = update_claim_verification(
+        claim_id,
+        result["verification_status"],
+        result["confidence"],
+        result["evidence"],
+        result["sources"]
+    )
+    if not saved["success"]:
+        logger.error(f"❌ {claim_id}: {saved['message']}")
+    return saved["success"]
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    args = parse_args()
+
+    db_client.connect(os.getenv("NEON_PROJECT_ID", ""), os.getenv("NEON_DATABASE_NAME", "neondb"))
+
+    if args.inline or not (USE_OPENAI and OPENAI_API_KEY):
+        # google-generativeai has no batch API, so Gemini runs go through the interactive path
+        backend = InlineBackend(os.path.dirname(os.path.abspath(args.job)))
+    else:
+        backend = OpenAIBatchBackend(base_url=args.base_url)
+
+    job = BulkJob(args.job, backend, date=args.date)
+    if not job.entries:
+        updated_before = datetime.utcnow() - timedelta(days=args.older_than_days) if args.older_than_days else None
+        rows = fetch_claims_for_reverification(args.limit, updated_before, args.status)
+        added = job.add_claims((row["id"], row["claim"]) for row in rows)
+        logger.info(f"Selected {added} claims for re-verification")
+
+    counts = job.run(None if args.no_write else write_verdict)
+    logger.info(f"✅ Job stages: {counts}")
+    logger.info(f"Usage: {json.dumps(stage_stats.summary())}")
+
+
+if __name__ == "__main__":
+    main()
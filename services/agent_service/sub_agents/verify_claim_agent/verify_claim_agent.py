@@ -3,6 +3,7 @@ import os
 import sys
 from google.adk.agents import LlmAgent
 from . import prompt
+from ...database import fetch_recent_verdicts
 from dotenv import load_dotenv
 
 # Add tools directory to path for claimcheck import
@@ -11,6 +12,10 @@ if tools_path not in sys.path:
     sys.path.insert(0, tools_path)
 
 from claimcheck import claimcheck_tool
+from claimcheck.verdict_lookup import verdict_index
+
+# Reuse stored verdicts for near-duplicate claims
+verdict_index.set_loader(fetch_recent_verdicts)
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -0,0 +1,20 @@
+"""Structured judge replies that parse as JSON but are not objects fall back to the text path"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+from claimcheck.modules import _parse_judgement
+
+
+@pytest.mark.parametrize("output", ['"Supported"', 'null', '[1]', '3', 'true', 'not json'])
+def test_non_object_reply_has_no_verdict(output):
+    assert _parse_judgement(output) == ("", output)
+
+
+def test_object_reply():
+    verdict, judgement = _parse_judgement('{"summary": "s", "reasoning": "r", "verdict": " Supported "}')
+    assert verdict == "Supported"
+    assert judgement == "s\n\nr `Supported`"
@@ -3,6 +3,23 @@ ClaimCheck - State-of-the-art fact-checking tool
 Ported from original ClaimCheck to use OpenAI/Gemini APIs
 """
 
-from .factchecker import verify_claim_advanced, claimcheck_tool
+from .factchecker import (
+    verify_claim_advanced, averify_claim_advanced,
+    verify_claims_batch, averify_claims_batch,
+    astream_verify_claim, VerificationEvent,
+    claimcheck_tool
+)
+from .scheduler import scheduler
+from .ratelimit import limiter_stats
+from .fetching import domain_stats
+from .llm import LLMCacheMiss, llm_cache
+from .usage import stage_stats
+from .hedging import hedge_stats
 
-__all__ = ['verify_claim_advanced', 'claimcheck_tool']
+__all__ = [
+    'verify_claim_advanced', 'averify_claim_advanced',
+    'verify_claims_batch', 'averify_claims_batch',
+    'astream_verify_claim', 'VerificationEvent',
+    'claimcheck_tool', 'scheduler', 'limiter_stats', 'domain_stats',
+    'LLMCacheMiss', 'llm_cache', 'stage_stats', 'hedge_stats'
+]
@@ -0,0 +1,72 @@
+"""Token-budgeted record compaction for ClaimCheck prompts"""
+import re
+import logging
+import collections
+from typing import Union
+
+from .ledger import EvidenceLedger, EVIDENCE, REASONING
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = {
+    "the", "and", "for", "are", "was", "were", "that", "this", "with", "from", "has",
+    "have", "had", "not", "but", "its", "his", "her", "their", "they", "will", "been",
+    "than", "into", "about", "which", "who", "what", "when", "where", "said", "also",
+}
+
+budget_stats = collections.Counter()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), no tokenizer dependency"""
+    return (len(text) + 3) // 4
+
+
+def terms(text: str) -> set:
+    return {t for t in re.findall(r"\w+", text.lower()) if len(t) > 2 and t not in STOPWORDS}
+
+
+def fit_record(record: Union[str, EvidenceLedger], budget: int) -> str:
+    """
+    Render the record within `budget` tokens.
+
+    The claim header and the latest reasoning are always kept. Remaining room
+    goes to evidence ranked by term overlap with the claim, then to the
+    planned actions and older reasoning, newest first. Kept entries stay in
+    record order. Plain string records are returned unchanged.
+    """
+    if isinstance(record, str):
+        return record
+
+    full = record.render()
+    full_tokens = estimate_tokens(full)
+    if budget <= 0 or full_tokens <= budget:
+        return full
+
+    entries = record.entries()
+    reasoning = [e for e in entries if e.kind == REASONING]
+    required = {id(reasoning[-1])} if reasoning else set()
+    used = estimate_tokens(record.header) + sum(estimate_tokens(e.render()) for e in entries if id(e) in required)
+
+    claim_terms = terms(record.claim) or {""}
+    evidence = [e for e in entries if e.kind == EVIDENCE]
+    evidence.sort(key=lambda e: len(claim_terms & terms(e.text)) / len(claim_terms), reverse=True)
+    rest = [e for e in reversed(entries) if e.kind != EVIDENCE and id(e) not in required]
+
+    kept = set(required)
+    for entry in evidence + rest:
+        cost = estimate_tokens(entry.render())
+        if used + cost <= budget:
+            kept.add(id(entry))
+            used += cost
+
+    dropped = len(entries) - len(kept)
+    text = record.header + ''.join(e.render() for e in entries if id(e) in kept)
+    if dropped:
+        text += f"({dropped} lower-priority record entries omitted for length)\n\n"
+
+    saved = full_tokens - estimate_tokens(text)
+    budget_stats["compactions"] += 1
+    budget_stats["tokens_saved"] += saved
+    logger.info(f"Record compacted to {estimate_tokens(text)} tokens, saved {saved} ({dropped} entries dropped)")
+    return text
@@ -0,0 +1,520 @@
+"""
+Offline bulk re-verification through provider batch APIs
+
+BulkJob runs the ClaimCheck stages for many claims together, one stage at a
+time: every pending plan prompt goes out in one provider batch, searches and
+scrapes run locally, then summaries, reasoning and verdicts follow as
+batches of their own. Batch endpoints answer within hours instead of
+seconds, but cost less and sit outside the interactive rate limits.
+
+Job state lives in a local SQLite file and is saved after every step, so
+running the same job again resumes where it stopped, including batches
+still running at the provider.
+"""
+import os
+import json
+import uuid
+import asyncio
+import logging
+import sqlite3
+import collections
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import (
+    OPENAI_API_KEY, LLM_TIMEOUT, RULES_PROMPT, JUDGE_MODE, JUDGE_SAMPLES,
+    BATCH_MAX_REQUESTS, BATCH_MAX_BYTES, BATCH_POLL_INTERVAL, BATCH_GATHER_CHUNK, BATCH_DISCOUNT,
+    BATCH_MAX_ATTEMPTS
+)
+from .factchecker import ClaimCheckVerifier, EvidenceFetcher, ALLOWED_VERDICTS, DECISION_OPTIONS
+from .ledger import ACTIONS, REASONING, VERDICT
+from .llm import _aprompt_provider, _clean_output, _model, _openai_params
+from .modules import (
+    summary_cache, _limit_result, _summary_key, _plan_prompt, _summarize_prompt,
+    _develop_prompt, _judge_prompt, _judgement_schema, _parse_judgement
+)
+from .prompts import JUDGE_PROMPT, JUDGE_JSON_PROMPT
+from .scheduler import scheduler
+from .usage import Usage, estimate_cost, stage_stats
+
+logger = logging.getLogger(__name__)
+
+# Claims move forward through these; develop may send a claim back to gather for another round.
+# A claim whose stage got no reply BATCH_MAX_ATTEMPTS times ends as failed and is never written.
+STAGES = ("plan", "gather", "summarize", "develop", "judge", "done", "written", "failed")
+MAX_ROUNDS = 3  # Develop iterations, as in ClaimCheckVerifier._arun
+
+# custom_id -> (output, usage); failed requests are left out
+Results = Dict[str, Tuple[str, Optional[Usage]]]
+
+
+class OpenAIBatchBackend:
+    """
+    OpenAI Batch API: requests are uploaded as a JSONL file and run as one
+    /v1/chat/completions batch. base_url points it at any compatible
+    endpoint, e.g. a local fake for tests.
+    """
+
+    provider = "openai"
+    discount = BATCH_DISCOUNT
+    RUNNING = {"validating", "in_progress", "finalizing", "cancelling"}
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        self.base_url = base_url
+        self.api_key = api_key or OPENAI_API_KEY
+
+    @property
+    def client(self):
+        import openai
+        # Connections belong to the loop that opened them
+        return scheduler.loop_resource(f"openai-batch:{self.base_url}", lambda: openai.AsyncOpenAI(
+            api_key=self.api_key, base_url=self.base_url, timeout=LLM_TIMEOUT
+        ))
+
+    def request(self, prompt: str, stage: str, schema: Optional[dict] = None) -> dict:
+        return _openai_params(prompt, _model(stage, self.provider), schema)
+
+    async def submit(self, requests: Dict[str, dict]) -> str:
+        lines = "".join(
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}) + "\n"
+            for custom_id, body in requests.items()
+        )
+        upload = await self.client.files.create(file=("claimcheck-batch.jsonl", lines.encode()), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(requests)} requests")
+        return batch.id
+
+    async def poll(self, batch_id: str) -> Optional[Results]:
+        """Results once the batch has ended, None while it is still running"""
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status in self.RUNNING:
+            return None
+
+        counts = batch.request_counts
+        logger.info(f"Batch {batch_id} {batch.status}: {counts.completed if counts else '?'} completed, "
+                    f"{counts.failed if counts else '?'} failed")
+        results = {}
+        # Expired and cancelled batches still return the requests that finished
+        if batch.output_file_id:
+            content = await self.client.files.content(batch.output_file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                body = response["body"]
+                usage = body.get("usage") or {}
+                results[item["custom_id"]] = (
+                    _clean_output(body["choices"][0]["message"]["content"] or ""),
+                    (usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+                     (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0)
+                )
+        return results
+
+    def discard(self, batch_id: str):
+        """Results stay with the provider until its file retention runs out"""
+
+
+class InlineBackend:
+    """
+    Runs each batch immediately through the interactive provider path (rate
+    limits, failover, hedging) and keeps its results next to the job file.
+    For Gemini, whose batch mode google-generativeai does not expose.
+    """
+
+    provider = None  # The configured primary
+    discount = 1.0
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, batch_id: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.json")
+
+    def request(self, prompt: str, stage: str, schema: Optional[dict] = None) -> dict:
+        return {"prompt": prompt, "stage": stage, "schema": schema}
+
+    async def submit(self, requests: Dict[str, dict]) -> str:
+        async def run(body):
+            output, usage, _, _ = await _aprompt_provider(body["prompt"], True, body["stage"], body["schema"])
+            return output, usage
+
+        outputs = await asyncio.gather(*(run(body) for body in requests.values()))
+        batch_id = f"inline-{uuid.uuid4().hex[:12]}"
+        with open(self._path(batch_id), "w") as f:
+            json.dump({custom_id: output for custom_id, output in zip(requests, outputs) if output[0]}, f)
+        return batch_id
+
+    async def poll(self, batch_id: str) -> Optional[Results]:
+        try:
+            with open(self._path(batch_id)) as f:
+                return {k: (output, tuple(usage) if usage else None) for k, (output, usage) in json.load(f).items()}
+        except FileNotFoundError:
+            logger.error(f"Results of {batch_id} are missing, treating its requests as failed")
+            return {}
+
+    def discard(self, batch_id: str):
+        """Delete the results file once the job has applied it"""
+        try:
+            os.remove(self._path(batch_id))
+        except FileNotFoundError:
+            pass
+
+
+class BulkJob:
+    """
+    Resumable re-verification of many claims. Claims advance through STAGES
+    together and each step is saved to the SQLite file at `path`.
+
+    Differences from the interactive pipeline: summaries of one round see
+    the record as it was before that round, and a text-mode judge reply
+    without a backticked verdict falls back to the most mentioned option
+    instead of being retried.
+    """
+
+    def __init__(self, path: str, backend, date: Optional[str] = None):
+        self.path = path
+        self.backend = backend
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS claims (id TEXT PRIMARY KEY, stage TEXT, state TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+
+        # Search dates stay fixed for the life of the job
+        self.date = self._meta("date") or date or datetime.now().strftime("%d-%m-%Y")
+        self._set_meta("date", self.date)
+        self._db.commit()
+
+        self.entries: Dict[str, dict] = {}
+        self.verifiers: Dict[str, ClaimCheckVerifier] = {}
+        for claim_id, state in self._db.execute("SELECT id, state FROM claims").fetchall():
+            self._load(claim_id, json.loads(state))
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: Optional[str]):
+        if value is None:
+            self._db.execute("DELETE FROM meta WHERE key = ?", (key,))
+        else:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _load(self, claim_id: str, entry: dict):
+        verifier = ClaimCheckVerifier(entry["claim"], self.date, max_actions=3, claim_id=claim_id)
+        if entry.get("report"):
+            verifier.report = entry["report"]
+        for key, kind, text, url in entry.get("ledger", []):
+            verifier.ledger.add(tuple(key), kind, text, url)
+        self.entries[claim_id] = entry
+        self.verifiers[claim_id] = verifier
+
+    def _save(self, claim_ids: Iterable[str]):
+        for claim_id in claim_ids:
+            entry, verifier = self.entries[claim_id], self.verifiers[claim_id]
+            entry["report"] = verifier.report
+            entry["ledger"] = [[list(e.key), e.kind, e.text, e.url] for e in verifier.ledger.entries()]
+            self._db.execute(
+                "INSERT OR REPLACE INTO claims (id, stage, state) VALUES (?, ?, ?)",
+                (claim_id, entry["stage"], json.dumps(entry))
+            )
+        self._db.commit()
+
+    def add_claims(self, claims: Iterable[Tuple[str, str]]) -> int:
+        """Queue (claim_id, claim) pairs not already in the job, returns how many were added"""
+        added = []
+        for claim_id, claim in claims:
+            if claim_id in self.entries or not claim:
+                continue
+            self._load(claim_id, {
+                "claim": claim, "stage": "plan", "round": 0,
+                "seen": [], "actions": [], "pages": [], "result": None
+            })
+            added.append(claim_id)
+        self._save(added)
+        return len(added)
+
+    def counts(self) -> Dict[str, int]:
+        return dict(collections.Counter(entry["stage"] for entry in self.entries.values()))
+
+    def _at(self, stage: str) -> List[str]:
+        return [claim_id for claim_id, entry in self.entries.items() if entry["stage"] == stage]
+
+    def _next_stage(self) -> Optional[str]:
+        for stage in STAGES[:STAGES.index("done")]:
+            if self._at(stage):
+                return stage
+        return None
+
+    # --- LLM stages ---
+
+    def _requests(self, stage: str, claim_id: str) -> Dict[str, dict]:
+        entry, verifier = self.entries[claim_id], self.verifiers[claim_id]
+        ledger = verifier.ledger
+        request = self.backend.request
+
+        if stage == "plan":
+            return {f"{claim_id}/0": request(_plan_prompt(entry["claim"], ledger), stage)}
+        if stage == "summarize":
+            return {
+                f"{claim_id}/{n}": request(_summarize_prompt(entry["claim"], limited, url, ledger), stage)
+                for n, (_, _, _, url, limited) in enumerate(entry["pages"])
+            }
+        if stage == "develop":
+            return {f"{claim_id}/0": request(_develop_prompt(ledger), stage)}
+
+        # Judge samples are the same prompt drawn JUDGE_SAMPLES times
+        if JUDGE_MODE == "structured":
+            prompt = _judge_prompt(ledger, DECISION_OPTIONS, RULES_PROMPT, JUDGE_JSON_PROMPT)
+            schema = _judgement_schema(DECISION_OPTIONS)
+        else:
+            prompt, schema = _judge_prompt(ledger, DECISION_OPTIONS, RULES_PROMPT, JUDGE_PROMPT), None
+        return {f"{claim_id}/{n}": request(prompt, stage, schema) for n in range(JUDGE_SAMPLES)}
+
+    def _chunks(self, requests: Dict[str, dict]) -> List[Dict[str, dict]]:
+        """Split requests to the provider's per-batch request and file size limits"""
+        chunks, current, size = [], {}, 0
+        for custom_id, body in requests.items():
+            body_size = len(json.dumps(body)) + 100
+            if current and (len(current) >= BATCH_MAX_REQUESTS or size + body_size > BATCH_MAX_BYTES):
+                chunks.append(current)
+                current, size = {}, 0
+            current[custom_id] = body
+            size += body_size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _submit(self, stage: str, batch_ids: Optional[List[str]] = None):
+        """Submit a stage's requests; batch_ids are the chunks already submitted before a restart"""
+        requests = {}
+        for claim_id in self._at(stage):
+            requests.update(self._requests(stage, claim_id))
+
+        # Requests are rebuilt from the saved state, so the chunks match the ones counted before
+        chunks = self._chunks(requests)
+        batch_ids = list(batch_ids or [])
+        for chunk in chunks[len(batch_ids):]:
+            batch_ids.append(await self.backend.submit(chunk))
+            # Saved per batch, so a restart doesn't pay for the submitted ones again
+            self._set_meta("batch", json.dumps({"stage": stage, "ids": batch_ids, "chunks": len(chunks)}))
+            self._db.commit()
+        logger.info(f"{stage}: {len(requests)} requests in {len(batch_ids)} batches")
+        await self._finish(stage, batch_ids)
+
+    async def _finish(self, stage: str, batch_ids: List[str]):
+        """Wait for a stage's batches and apply their results"""
+        results: Results = {}
+        for batch_id in batch_ids:
+            while (output := await self.backend.poll(batch_id)) is None:
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+            results.update(output)
+
+        claim_ids = self._at(stage)
+        apply = getattr(self, f"_apply_{stage}")
+        for claim_id in claim_ids:
+            entry = self.entries[claim_id]
+            outputs = [self._output(stage, claim_id, n, results) for n in range(self._request_count(stage, claim_id))]
+            # Missing replies (failed or expired batches, non-200 requests) are not answers: the claim
+            # stays at its stage and is resubmitted. Summaries that did come back are kept.
+            if all(outputs) or stage == "summarize":
+                apply(claim_id, outputs.__getitem__)
+            if entry["stage"] == stage:
+                self._retry(claim_id, stage)
+            else:
+                entry["attempts"] = 0
+        self._set_meta("batch", None)
+        self._save(claim_ids)
+        for batch_id in batch_ids:
+            self.backend.discard(batch_id)
+        logger.info(f"{stage}: {len(results)} results applied, stages now {self.counts()}")
+
+    def _request_count(self, stage: str, claim_id: str) -> int:
+        if stage == "summarize":
+            return len(self.entries[claim_id]["pages"])
+        return JUDGE_SAMPLES if stage == "judge" else 1
+
+    def _retry(self, claim_id: str, stage: str):
+        entry = self.entries[claim_id]
+        entry["attempts"] = entry.get("attempts", 0) + 1
+        if entry["attempts"] >= BATCH_MAX_ATTEMPTS:
+            logger.error(f"{claim_id}: no {stage} reply after {entry['attempts']} batches, giving up")
+            entry.update(stage="failed", error=f"No {stage} reply after {entry['attempts']} batches")
+        else:
+            logger.warning(f"{claim_id}: {stage} reply missing, resubmitting ({entry['attempts']}/{BATCH_MAX_ATTEMPTS})")
+
+    def _output(self, stage: str, claim_id: str, n: int, results: Results) -> str:
+        output, usage = results.get(f"{claim_id}/{n}", ("", None))
+        model = _model(stage, self.backend.provider)
+        cost = estimate_cost(model, usage) * self.backend.discount
+        for stats in (stage_stats, self.verifiers[claim_id].usage):
+            stats.record(stage, model, 0.0, usage, cached=False, failed=not output, cost=cost)
+        return output
+
+    def _after_gather(self, entry: dict) -> str:
+        return "develop" if entry["round"] < MAX_ROUNDS else "judge"
+
+    def _apply_plan(self, claim_id: str, output: Callable[[int], str]):
+        entry, verifier = self.entries[claim_id], self.verifiers[claim_id]
+        actions = output(0)
+        verifier.ledger.add((0, 0), ACTIONS, f"## Iteration 1: Actions\n\n{actions}")
+        action_lines = verifier.extract_action_lines(actions)
+        entry.update(actions=action_lines, seen=action_lines, stage="gather")
+
+    def _apply_summarize(self, claim_id: str, output: Callable[[int], str]):
+        entry, verifier = self.entries[claim_id], self.verifiers[claim_id]
+        remaining = []
+        for n, page in enumerate(entry["pages"]):
+            key, identifier, query, url, limited = page
+            summary = output(n)
+            if not summary:
+                remaining.append(page)  # Resubmitted
+                continue
+            summary_cache.set(_summary_key(entry["claim"], url, limited), summary)
+            if "NONE" not in summary:
+                verifier.record_evidence(identifier, query, url, summary, tuple(key))
+        entry["pages"] = remaining
+        if not remaining:
+            entry["stage"] = self._after_gather(entry)
+
+    def _apply_develop(self, claim_id: str, output: Callable[[int], str]):
+        entry, verifier = self.entries[claim_id], self.verifiers[claim_id]
+        reasoning = output(0)
+        verifier.ledger.add((entry["round"], 2), REASONING, f"### Reasoning\n\n{reasoning}")
+        verifier.report["reasoning"].append(reasoning)
+
+        action_lines = verifier.extract_reasoning_actions(reasoning)
+        done = not action_lines or (len(action_lines) == 1 and action_lines[0].strip().lower() == 'none')
+        if done or any(line in entry["seen"] for line in action_lines):
+            entry["stage"] = "judge"
+            return
+        entry.update(seen=entry["seen"] + action_lines, actions=action_lines,
+                     round=entry["round"] + 1, stage="gather")
+
+    def _apply_judge(self, claim_id: str, output: Callable[[int], str]):
+        entry, verifier = self.entries[claim_id], self.verifiers[claim_id]
+        samples = []
+        for n in range(JUDGE_SAMPLES):
+            reply = output(n)
+            if JUDGE_MODE == "structured":
+                pred_verdict, verdict = _parse_judgement(reply)
+            else:
+                pred_verdict, verdict = verifier.extract_verdict(reply), reply
+            if pred_verdict not in ALLOWED_VERDICTS:
+                pred_verdict = verifier.fallback_verdict(verdict)
+            samples.append((pred_verdict, verdict))
+
+        pred_verdict, verdict = verifier.tally_votes(samples)
+        verifier.ledger.add((entry["round"] + 1, 3), VERDICT, f"### Verdict\n\n{verdict}")
+        verifier.report["judged_verdict"] = verdict
+        verifier.report["verdict"] = pred_verdict
+        entry.update(result=verifier.build_result(pred_verdict, verdict), stage="done")
+
+    # --- Local stage ---
+
+    async def _gather_claim(self, claim_id: str, fetcher: EvidenceFetcher, actions: List[tuple]):
+        """actions: (action index, identifier, query, search future) of the claim's started web_search lines"""
+        entry, verifier = self.entries[claim_id], self.verifiers[claim_id]
+        claim = entry["claim"]
+
+        async def process_action(action_index: int, identifier: str, query: str, search: Awaitable):
+            urls, snippets = await search
+            verifier.record_search_results(identifier, urls, snippets)
+
+            async def process_result(url_index: int, url: str):
+                scraped_content = await fetcher.scrape(url)
+                if not scraped_content or scraped_content == "Unable to Scrape":
+                    return
+                limited = _limit_result(scraped_content, claim, query)
+                if limited is None:
+                    return
+                key = [entry["round"], 1, action_index, url_index]
+                cached = await summary_cache.aget(_summary_key(claim, url, limited))
+                if cached is None:
+                    entry["pages"].append([key, identifier, query, url, limited])
+                elif "NONE" not in cached:
+                    verifier.record_evidence(identifier, query, url, cached, tuple(key))
+
+            await asyncio.gather(*(process_result(i, url) for i, url in enumerate(urls)))
+
+        async def guarded(action: tuple):
+            try:
+                await process_action(*action)
+            except Exception as e:
+                logger.error(f"Error processing action '{action[1]}': {e}")
+
+        await asyncio.gather(*(guarded(action) for action in actions))
+
+    async def _gather(self):
+        """
+        Search and scrape for the next BATCH_GATHER_CHUNK claims; the chunk's
+        searches go out as one batched search. Pages without a cached summary
+        await summarize.
+        """
+        claim_ids = self._at("gather")[:BATCH_GATHER_CHUNK]
+        fetcher = EvidenceFetcher()  # Shared by the chunk, dropped with it
+
+        planned = []  # (claim id, action index, identifier, query)
+        for claim_id in claim_ids:
+            for action_index, line in enumerate(self.entries[claim_id]["actions"]):
+                started = self.verifiers[claim_id].start_action(line)
+                if started:
+                    planned.append((claim_id, action_index, *started))
+        searches = fetcher.search_many([query for *_, query in planned], self.date, top_k=3)
+        actions = {claim_id: [] for claim_id in claim_ids}
+        for (claim_id, *action), search in zip(planned, searches):
+            actions[claim_id].append((*action, search))
+
+        await asyncio.gather(*(self._gather_claim(claim_id, fetcher, actions[claim_id]) for claim_id in claim_ids))
+
+        for claim_id in claim_ids:
+            entry = self.entries[claim_id]
+            entry["pages"].sort(key=lambda page: page[0])
+            entry.update(actions=[], stage="summarize" if entry["pages"] else self._after_gather(entry))
+        self._save(claim_ids)
+        logger.info(f"gather: {len(claim_ids)} claims with {fetcher.stats()}")
+
+    # --- Driver ---
+
+    def _write(self, write: Callable[[str, dict], bool]):
+        claim_ids = self._at("done")
+        for claim_id in claim_ids:
+            entry = self.entries[claim_id]
+            if write(claim_id, entry["result"]):
+                entry["stage"] = "written"
+        self._save(claim_ids)
+
+    async def arun(self, write: Optional[Callable[[str, dict], bool]] = None) -> Dict[str, int]:
+        """
+        Advance every claim to a verdict, then pass each new result to
+        write(claim_id, result), which returns False to retry on the next
+        run. Claims that ran out of batch attempts end as "failed" and are
+        not written. Returns the number of claims per stage.
+        """
+        pending = self._meta("batch")
+        if pending:
+            pending = json.loads(pending)
+            if len(pending["ids"]) < pending.get("chunks", 0):
+                logger.info(f"Resuming {pending['stage']} after {len(pending['ids'])} of {pending['chunks']} batches")
+                await self._submit(pending["stage"], pending["ids"])
+            else:
+                logger.info(f"Resuming {pending['stage']} batches {pending['ids']}")
+                await self._finish(pending["stage"], pending["ids"])
+
+        while (stage := self._next_stage()) is not None:
+            if stage == "gather":
+                await self._gather()
+            else:
+                await self._submit(stage)
+
+        if write:
+            self._write(write)
+        return self.counts()
+
+    def run(self, write: Optional[Callable[[str, dict], bool]] = None) -> Dict[str, int]:
+        """Blocking arun"""
+        return scheduler.run(self.arun(write))
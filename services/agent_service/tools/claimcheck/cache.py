@@ -0,0 +1,315 @@
+"""Two-level caches - in-memory LRU over an optional SQLite table"""
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+import collections
+from typing import Any, Callable, Dict, Optional, Tuple
+from .scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+DB_TIMEOUT = 0.5  # Seconds to wait for another process's lock before treating the disk layer as a miss
+TOUCH_BATCH = 512  # Pending access times written together
+EVICT_TO = 0.9  # Evict down to this share of max_bytes, so eviction runs now and then rather than every set
+
+
+class TieredCache:
+    """
+    LRU memory cache with an optional on-disk SQLite layer shared by name.
+    Values must be JSON-serializable. ttl=None keeps entries until evicted,
+    ttl <= 0 disables the cache.
+    max_bytes bounds the disk layer, evicting least recently used rows.
+
+    Disk errors (including another process holding the database) are logged
+    and treated as misses. Access times are kept in memory and written with
+    the next set or every TOUCH_BATCH hits, not on each hit.
+
+    The a* methods are for the event loop: memory hits are served inline,
+    anything that touches SQLite runs on scheduler.executor. The memory tier
+    has its own lock, so it never waits for a disk operation.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl: Optional[float] = None,
+                 db_path: str = "", max_bytes: Optional[int] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = ttl is None or ttl > 0
+        self.max_bytes = max_bytes
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()  # Memory tier, pending access times and counters
+        self._db_lock = threading.Lock()  # Connection and _disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        self._touched: Dict[str, float] = {}
+        self._disk_bytes = 0  # Running total of this namespace's row sizes
+
+        if db_path and self.enabled:
+            try:
+                self._db = sqlite3.connect(db_path, timeout=DB_TIMEOUT, check_same_thread=False)
+                # WAL lets readers in other processes continue while one writes
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "namespace TEXT, key TEXT, value TEXT, stored_at REAL, "
+                    "accessed_at REAL, size INTEGER, "
+                    "PRIMARY KEY (namespace, key))"
+                )
+                self._db.commit()
+                self._disk_bytes = self._namespace_bytes()
+            except sqlite3.Error as e:
+                logger.error(f"Cache '{name}' disk layer disabled: {e}")
+                self._db = None
+
+    def _fresh(self, stored_at: float) -> bool:
+        return self.ttl is None or time.time() - stored_at < self.ttl
+
+    def _remember(self, key: str, value: Any, stored_at: float):
+        """Caller holds _lock"""
+        self._memory[key] = (value, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _namespace_bytes(self) -> int:
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?", (self.name,)
+        ).fetchone()[0]
+
+    def _note_access(self, key: str) -> bool:
+        """Caller holds _lock; returns True once TOUCH_BATCH access times are pending"""
+        # Only the size-bounded disk layer needs recency
+        if self._db and self.max_bytes:
+            self._touched[key] = time.time()
+            return len(self._touched) >= TOUCH_BATCH
+        return False
+
+    def _flush_touched(self):
+        """Write pending access times; the caller holds _db_lock and commits"""
+        with self._lock:
+            touched = [(accessed_at, self.name, key) for key, accessed_at in self._touched.items()]
+            self._touched.clear()
+        if touched:
+            self._db.executemany("UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?", touched)
+
+    def _flush_access_times(self):
+        with self._db_lock:
+            try:
+                self._flush_touched()
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._rollback(f"access time update failed: {e}")
+
+    def _rollback(self, message: str):
+        logger.error(f"Cache '{self.name}' {message}")
+        try:
+            self._db.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _from_memory(self, key: str) -> Tuple[Optional[Tuple[Any, float]], bool]:
+        """(memory entry or None, whether pending access times are due to be written)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if not entry:
+                return None, False
+            self._memory.move_to_end(key)
+            return entry, self._note_access(key)
+
+    def _from_disk(self, key: str) -> Optional[Tuple[Any, float]]:
+        if not self._db:
+            return None
+        with self._db_lock:
+            try:
+                row = self._db.execute(
+                    "SELECT value, stored_at FROM cache WHERE namespace = ? AND key = ?",
+                    (self.name, key)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Cache '{self.name}' read failed: {e}")
+                return None
+        if not row:
+            return None
+        value = json.loads(row[0])
+        with self._lock:
+            self._remember(key, value, row[1])
+            due = self._note_access(key)
+        if due:
+            self._flush_access_times()
+        return value, row[1]
+
+    def _lookup(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry, due = self._from_memory(key)
+        if due:
+            self._flush_access_times()
+        return entry or self._from_disk(key)
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value if present and not expired"""
+        if not self.enabled:
+            return None
+        entry = self._lookup(key)
+        if entry and self._fresh(entry[1]):
+            self._count(True)
+            return entry[0]
+        self._count(False)
+        return None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, stored_at) ignoring the TTL, for callers that revalidate"""
+        entry = self._lookup(key)
+        self._count(bool(entry))
+        return entry
+
+    def _evict(self):
+        """Caller holds _db_lock"""
+        if self._disk_bytes <= self.max_bytes:
+            return
+        self._flush_touched()
+        # Other processes sharing the file change it too; recount before evicting
+        total = self._namespace_bytes()
+        target = self.max_bytes * EVICT_TO
+        rows = self._db.execute(
+            "SELECT key, size FROM cache WHERE namespace = ? ORDER BY accessed_at",
+            (self.name,)
+        )
+        evicted = []
+        for key, size in rows:
+            if total <= target:
+                break
+            evicted.append((self.name, key))
+            total -= size or 0
+        if evicted:
+            self._db.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", evicted)
+            with self._lock:
+                for _, key in evicted:
+                    self._memory.pop(key, None)
+                    self._touched.pop(key, None)
+                self.evictions += len(evicted)
+        self._disk_bytes = total
+
+    def _stored_size(self, key: str) -> int:
+        row = self._db.execute(
+            "SELECT size FROM cache WHERE namespace = ? AND key = ?", (self.name, key)
+        ).fetchone()
+        return (row[0] or 0) if row else 0
+
+    def _write(self, key: str, value: Any, stored_at: float):
+        payload = json.dumps(value)
+        with self._db_lock:
+            disk_bytes = self._disk_bytes
+            try:
+                replaced = self._stored_size(key) if self.max_bytes else 0
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache "
+                    "(namespace, key, value, stored_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.name, key, payload, stored_at, stored_at, len(payload))
+                )
+                with self._lock:
+                    self._touched.pop(key, None)
+                if self.max_bytes:
+                    self._disk_bytes += len(payload) - replaced
+                    self._flush_touched()
+                    self._evict()
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._disk_bytes = disk_bytes
+                self._rollback(f"write failed: {e}")
+
+    def _erase(self, key: str):
+        with self._db_lock:
+            try:
+                size = self._stored_size(key)
+                self._db.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.name, key))
+                self._db.commit()
+                self._disk_bytes -= size
+            except sqlite3.Error as e:
+                self._rollback(f"delete failed: {e}")
+
+    def _set_memory(self, key: str, value: Any) -> float:
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, value, stored_at)
+        return stored_at
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+            self._touched.pop(key, None)
+
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        stored_at = self._set_memory(key, value)
+        if self._db:
+            self._write(key, value, stored_at)
+
+    def delete(self, key: str):
+        self._forget(key)
+        if self._db:
+            self._erase(key)
+
+    async def _off_loop(self, function: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(scheduler.executor, function, *args)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get without blocking the event loop"""
+        if not self.enabled:
+            return None
+        entry, due = self._from_memory(key)
+        if entry and self._fresh(entry[1]) and not due:
+            self._count(True)
+            return entry[0]
+        if not self._db:
+            self._count(False)
+            return None
+        return await self._off_loop(self.get, key)
+
+    async def aget_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """get_entry without blocking the event loop"""
+        entry, due = self._from_memory(key)
+        if entry and not due:
+            self._count(True)
+            return entry
+        if not self._db:
+            self._count(False)
+            return None
+        return await self._off_loop(self.get_entry, key)
+
+    async def aset(self, key: str, value: Any):
+        """set without blocking the event loop; the memory tier is updated before it returns"""
+        if not self.enabled:
+            return
+        stored_at = self._set_memory(key, value)
+        if self._db:
+            await self._off_loop(self._write, key, value, stored_at)
+
+    async def adelete(self, key: str):
+        """delete without blocking the event loop"""
+        self._forget(key)
+        if self._db:
+            await self._off_loop(self._erase, key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
@@ -1,5 +1,6 @@
 """Configuration for ClaimCheck"""
 import os
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +15,110 @@ USE_OPENAI = os.getenv("USE_OPENAI", "true").lower() == "true"  # Default to Ope
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")  # Use full gpt-4o for better results
 GEMINI_MODEL = os.getenv("GEMINI_MODEL_CLAIMCHECK", "gemini-2.5-pro")
 
+# USD per 1M (prompt, completion, cached prompt) tokens for cost estimates;
+# CLAIMCHECK_MODEL_PRICES (JSON) adds/overrides
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gpt-4o-mini": (0.15, 0.60, 0.075),
+    "gemini-2.5-pro": (1.25, 10.00, 0.31),
+    "gemini-2.5-flash": (0.30, 2.50, 0.075),
+    **json.loads(os.getenv("CLAIMCHECK_MODEL_PRICES", "{}")),
+}
+
+# Per-stage model overrides for the active provider, e.g. a fast model for summarize (unset = model above)
+STAGE_MODELS = {
+    stage: os.getenv(f"CLAIMCHECK_{stage.upper()}_MODEL", "")
+    for stage in ("plan", "summarize", "develop", "judge")
+}
+
+# Process-wide concurrency caps (shared by every claim in flight)
+SEARCH_CONCURRENCY = int(os.getenv("CLAIMCHECK_SEARCH_CONCURRENCY", "8"))
+SCRAPE_CONCURRENCY = int(os.getenv("CLAIMCHECK_SCRAPE_CONCURRENCY", "16"))
+LLM_CONCURRENCY = int(os.getenv("CLAIMCHECK_LLM_CONCURRENCY", "8"))
+BLOCKING_WORKERS = int(os.getenv("CLAIMCHECK_BLOCKING_WORKERS", "8"))
+
+# Queries per batched Serper request; a planning round's web_search actions go out together
+SEARCH_BATCH_SIZE = max(1, int(os.getenv("CLAIMCHECK_SEARCH_BATCH_SIZE", "100")))
+
+# Pooled HTTP clients for Serper and page fetches: keep-alive connections kept,
+# retries of connection errors and 429/5xx responses with exponential backoff
+HTTP_POOL_HOSTS = int(os.getenv("CLAIMCHECK_HTTP_POOL_HOSTS", "64"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("CLAIMCHECK_HTTP_KEEPALIVE_SECONDS", "60"))
+HTTP_RETRIES = int(os.getenv("CLAIMCHECK_HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("CLAIMCHECK_HTTP_BACKOFF", "0.5"))
+
+# Per-site politeness for page fetches, within SCRAPE_CONCURRENCY: concurrent requests per domain and
+# requests per minute per domain (0 disables), allowing short bursts of DOMAIN_BURST
+DOMAIN_CONCURRENCY = int(os.getenv("CLAIMCHECK_DOMAIN_CONCURRENCY", "2"))
+DOMAIN_RPM = float(os.getenv("CLAIMCHECK_DOMAIN_RPM", "60"))
+DOMAIN_BURST = float(os.getenv("CLAIMCHECK_DOMAIN_BURST", "4"))
+
+# Pages declaring a larger Content-Length are skipped, others are cut off there; non-HTML/text types are skipped
+MAX_PAGE_BYTES = int(os.getenv("CLAIMCHECK_MAX_PAGE_KB", "2048")) * 1024
+
+# Page text extraction (extraction.py): "lxml" (drops menus, banners and footers) or "soup" (BeautifulSoup, all text)
+HTML_EXTRACTOR = os.getenv("CLAIMCHECK_HTML_EXTRACTOR", "lxml").lower()
+
+# Persistent LLM clients - keep-alive pool sized to the LLM lane
+LLM_TIMEOUT = float(os.getenv("CLAIMCHECK_LLM_TIMEOUT", "120"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("CLAIMCHECK_LLM_KEEPALIVE_SECONDS", "90"))
+
+# Provider rate limits (0 disables a bucket); a 429 slows the bucket down until calls succeed again
+OPENAI_RPM = float(os.getenv("CLAIMCHECK_OPENAI_RPM", "500"))
+OPENAI_TPM = float(os.getenv("CLAIMCHECK_OPENAI_TPM", "450000"))
+GEMINI_RPM = float(os.getenv("CLAIMCHECK_GEMINI_RPM", "150"))
+GEMINI_TPM = float(os.getenv("CLAIMCHECK_GEMINI_TPM", "2000000"))
+LLM_MAX_RETRIES = int(os.getenv("CLAIMCHECK_LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("CLAIMCHECK_LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("CLAIMCHECK_LLM_BACKOFF_MAX", "60"))
+
+# Cross-provider failover when both keys are set; hedging (async calls) races the secondary provider
+# against a primary call slower than its recent latency percentile
+LLM_FAILOVER = os.getenv("CLAIMCHECK_LLM_FAILOVER", "true").lower() == "true"
+LLM_HEDGE = os.getenv("CLAIMCHECK_LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("CLAIMCHECK_LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("CLAIMCHECK_LLM_HEDGE_DELAY", "30"))  # Until enough latencies are seen
+
+# Pages mentioning fewer than this share of the claim/query terms are not summarized (0 disables)
+RELEVANCE_THRESHOLD = float(os.getenv("CLAIMCHECK_RELEVANCE_THRESHOLD", "0.2"))
+
+# Judge: "text" (backticked verdict, up to 3 tries) or "structured" (provider JSON output limited to the
+# four verdicts); JUDGE_SAMPLES > 1 runs that many judgements in parallel and takes the majority
+JUDGE_MODE = os.getenv("CLAIMCHECK_JUDGE_MODE", "text").lower()
+JUDGE_SAMPLES = max(1, int(os.getenv("CLAIMCHECK_JUDGE_SAMPLES", "1")))
+
+# Upper bound on prompt size; older/less relevant record entries are dropped to fit (0 disables)
+PROMPT_TOKEN_BUDGET = int(os.getenv("CLAIMCHECK_PROMPT_TOKEN_BUDGET", "8000"))
+
+# Caches - CLAIMCHECK_CACHE_DB enables the shared on-disk SQLite layer
+CACHE_DB_PATH = os.getenv("CLAIMCHECK_CACHE_DB", "")
+SEARCH_CACHE_TTL = float(os.getenv("CLAIMCHECK_SEARCH_CACHE_TTL", "21600"))  # 0 disables
+SEARCH_CACHE_SIZE = int(os.getenv("CLAIMCHECK_SEARCH_CACHE_SIZE", "1024"))
+PAGE_CACHE_SIZE = int(os.getenv("CLAIMCHECK_PAGE_CACHE_SIZE", "256"))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("CLAIMCHECK_PAGE_CACHE_MAX_MB", "256")) * 1024 * 1024
+PAGE_REVALIDATE_AFTER = float(os.getenv("CLAIMCHECK_PAGE_REVALIDATE_AFTER", "3600"))
+SUMMARY_CACHE_TTL = float(os.getenv("CLAIMCHECK_SUMMARY_CACHE_TTL", "604800"))  # 0 disables
+SUMMARY_CACHE_SIZE = int(os.getenv("CLAIMCHECK_SUMMARY_CACHE_SIZE", "4096"))
+
+# LLM response cache: "off", "record" (read-through) or "replay" (misses raise LLMCacheMiss).
+# Replay needs the recording's provider and model settings; a placeholder API key is enough.
+LLM_CACHE_MODE = os.getenv("CLAIMCHECK_LLM_CACHE", "off").lower()
+LLM_CACHE_SIZE = int(os.getenv("CLAIMCHECK_LLM_CACHE_SIZE", "4096"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("CLAIMCHECK_LLM_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Bulk re-verification (bulk.py): batch size limits of the provider's batch API and status polling
+BATCH_MAX_REQUESTS = int(os.getenv("CLAIMCHECK_BATCH_MAX_REQUESTS", "50000"))
+BATCH_MAX_BYTES = int(os.getenv("CLAIMCHECK_BATCH_MAX_MB", "190")) * 1024 * 1024
+BATCH_POLL_INTERVAL = float(os.getenv("CLAIMCHECK_BATCH_POLL_SECONDS", "60"))
+BATCH_GATHER_CHUNK = int(os.getenv("CLAIMCHECK_BATCH_GATHER_CHUNK", "100"))  # Claims searched/scraped per saved step
+BATCH_DISCOUNT = float(os.getenv("CLAIMCHECK_BATCH_DISCOUNT", "0.5"))  # Batch price relative to MODEL_PRICES
+BATCH_MAX_ATTEMPTS = int(os.getenv("CLAIMCHECK_BATCH_MAX_ATTEMPTS", "3"))  # Submissions of a claim's stage before it fails
+
+# Reuse verdicts of near-identical claims verified within the window (0 disables)
+VERDICT_LOOKUP_WINDOW_HOURS = float(os.getenv("CLAIMCHECK_VERDICT_WINDOW_HOURS", "72"))
+VERDICT_LOOKUP_THRESHOLD = float(os.getenv("CLAIMCHECK_VERDICT_SIMILARITY", "0.85"))
+VERDICT_LOOKUP_REFRESH = float(os.getenv("CLAIMCHECK_VERDICT_REFRESH_SECONDS", "300"))
+
 # Verify API keys
 if USE_OPENAI:
     if OPENAI_API_KEY:
@@ -0,0 +1,160 @@
+"""HTML text extraction - pluggable backends turning a downloaded page into the text that gets summarized"""
+import re
+import logging
+from typing import Dict, Type
+from bs4 import BeautifulSoup
+from .config import HTML_EXTRACTOR
+
+logger = logging.getLogger(__name__)
+
+# Never page content
+NOISE_TAGS = (
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "button", "select", "dialog"
+)
+# Site chrome when inside the content
+CHROME_TAGS = {"nav", "footer", "aside"}
+NOISE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog", "search", "menu"}
+# class/id words of site chrome; matched as whole words of a dashed/underscored name
+NOISE_NAMES = re.compile(
+    r"(?:^|[\s_-])(?:cookies?|consent|gdpr|banner|newsletter|subscribe|signup|paywall|share|sharing|social|"
+    r"related|recommended|promo|sponsored|advert|ads?|breadcrumbs?|sidebar|menu|navbar|nav|footer|masthead|"
+    r"comments?|popup|modal|overlay|toolbar|skip)(?:$|[\s_-])",
+    re.IGNORECASE
+)
+# Names and forms are weak signals: a <div class="wrapper has-sidebar"> or the
+# <form id="form1"> around an ASP.NET WebForms page holds the whole content, so
+# they are only dropped when their text is below this share of the content's
+NOISE_MAX_SHARE = 0.5
+CANDIDATES = ".//*[@class or @id or @role or @aria-hidden or @hidden] | .//nav | .//footer | .//aside | .//form"
+# Boilerplate checks never remove these
+CONTENT_TAGS = {"html", "body", "main", "article"}
+
+
+class SoupExtractor:
+    """
+    BeautifulSoup with html.parser: all text of the first <article>, or of
+    the whole page. Pure Python, so slow, and keeps menus, cookie banners
+    and footers when there is no <article>.
+    """
+
+    name = "soup"
+
+    def extract(self, content: bytes) -> str:
+        soup = BeautifulSoup(content, 'html.parser')
+        if soup.article:
+            soup = soup.article
+
+        text = soup.get_text(separator=' ', strip=True)
+        return ' '.join(text.split())  # Clean whitespace
+
+
+class LxmlExtractor:
+    """
+    lxml (libxml2) parse, then boilerplate removal: scripts and styles are
+    stripped, the content is the longest <article>, else <main>, else the
+    body, and within it navigation, footers, asides and hidden elements are
+    removed. Elements whose class or id marks them as cookie/consent
+    banners, sharing widgets, related links or comments, and forms, are
+    removed only when they hold a small part of the content's text.
+    """
+
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._etree = etree
+        self._parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+        self._utf8_parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True, encoding="utf-8")
+
+    def _parse(self, content: bytes):
+        # libxml2 reads pages without a <meta charset> as Latin-1; most of them are UTF-8
+        try:
+            content.decode("utf-8")
+            parser = self._utf8_parser
+        except UnicodeDecodeError:
+            parser = self._parser
+        return self._html.document_fromstring(content, parser=parser)
+
+    def _is_chrome(self, element) -> bool:
+        if element.tag in CHROME_TAGS or element.get("role", "").lower() in NOISE_ROLES:
+            return True
+        return element.get("aria-hidden") == "true" or element.get("hidden") is not None
+
+    def _is_named_noise(self, element) -> bool:
+        if element.tag == "form":
+            return True
+        names = f"{element.get('class', '')} {element.get('id', '')}"
+        return bool(NOISE_NAMES.search(names))
+
+    def _text(self, element) -> str:
+        return ' '.join(' '.join(element.itertext()).split())
+
+    def _size(self, element) -> int:
+        return sum(len(text.strip()) for text in element.itertext())
+
+    def _content(self, root):
+        """The longest <article>, else <main>, else the body"""
+        for path in ("//article", "//main", "//*[@role='main']"):
+            candidates = [(self._size(candidate), candidate) for candidate in root.xpath(path)]
+            if candidates:
+                size, best = max(candidates, key=lambda candidate: candidate[0])
+                if size:
+                    return best
+        body = root.find("body")
+        return body if body is not None else root
+
+    def _strip_noise(self, content):
+        # Only inside the content, so nothing removed can be one of its ancestors
+        limit = self._size(content) * NOISE_MAX_SHARE
+        noise = [
+            element for element in content.xpath(CANDIDATES)
+            if element.tag not in CONTENT_TAGS
+            and (self._is_chrome(element) or (self._is_named_noise(element) and self._size(element) < limit))
+        ]
+        for element in noise:
+            # Skip elements already removed with an ancestor
+            ancestor = element.getparent()
+            while ancestor is not None and ancestor is not content:
+                ancestor = ancestor.getparent()
+            if ancestor is content:
+                element.drop_tree()
+
+    def extract(self, content: bytes) -> str:
+        if not content or not content.strip():
+            return ""
+        try:
+            root = self._parse(content)
+        except (self._etree.ParserError, ValueError):
+            return ""
+
+        self._etree.strip_elements(root, *NOISE_TAGS, with_tail=False)
+        main = self._content(root)
+        self._strip_noise(main)
+        return self._text(main)
+
+
+EXTRACTORS: Dict[str, Type] = {
+    "soup": SoupExtractor,
+    "lxml": LxmlExtractor,
+}
+
+
+def register_extractor(name: str, cls: Type):
+    """Add a backend: a class whose extract(content: bytes) returns the page text"""
+    EXTRACTORS[name] = cls
+
+
+def get_extractor(name: str = HTML_EXTRACTOR):
+    """Instance of the named backend; falls back to BeautifulSoup if its package is missing"""
+    cls = EXTRACTORS.get(name)
+    if cls is None:
+        logger.warning(f"Unknown HTML extractor {name!r}, using soup")
+        return SoupExtractor()
+    try:
+        return cls()
+    except ImportError as e:
+        logger.warning(f"HTML extractor {name!r} unavailable ({e}), using soup")
+        return SoupExtractor()
@@ -3,28 +3,114 @@ ClaimCheck FactChecker - Original implementation logic
 Ported to use OpenAI/Gemini instead of Ollama
 """
 import re
+import time
+import hashlib
+import asyncio
+import collections
 import logging
-import concurrent.futures
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 from google.adk.tools import FunctionTool
 
-from .config import RULES_PROMPT
-from .modules import plan_searches, summarize_evidence, develop_reasoning, judge_verdict
-from .web_tools import web_search, scrape_url_content
+from .config import RULES_PROMPT, JUDGE_MODE, JUDGE_SAMPLES
+from .llm import LLMCacheMiss
+from .modules import aplan_searches, asummarize_evidence, adevelop_reasoning, ajudge_verdict, ajudge_structured
+from .web_tools import asearch_many, ascrape_url_content, normalize_query
+from .scheduler import scheduler
+from .usage import StageStats, claim_usage
+from .verdict_lookup import verdict_index
+from .ledger import EvidenceLedger, ACTIONS, EVIDENCE, REASONING, VERDICT
 
 logger = logging.getLogger(__name__)
 
+ALLOWED_VERDICTS = {
+    "Supported", "Refuted",
+    "Conflicting Evidence/Cherrypicking",
+    "Not Enough Evidence"
+}
+DECISION_OPTIONS = "Supported|Refuted|Conflicting Evidence/Cherrypicking|Not Enough Evidence"
+
+STATUS_MAPPING = {
+    "Supported": "verified",
+    "Refuted": "false",
+    "Conflicting Evidence/Cherrypicking": "disputed",
+    "Not Enough Evidence": "unverifiable"
+}
+
+CONFIDENCE_MAPPING = {
+    "Supported": 90,
+    "Refuted": 90,
+    "Conflicting Evidence/Cherrypicking": 50,
+    "Not Enough Evidence": 20
+}
+
+
+class EvidenceFetcher:
+    """
+    Memoizes searches and scrapes for one or more verifiers.
+    Concurrent requests for the same query or URL share one in-flight task;
+    the new queries of one search_many call go out as one batched search.
+    """
+
+    def __init__(self):
+        self._searches: Dict[tuple, asyncio.Task] = {}
+        self._pages: Dict[str, asyncio.Task] = {}
+
+    def search_many(self, queries: List[str], date: str, top_k: int = 3) -> List[asyncio.Future]:
+        keys = [(normalize_query(query), date, top_k) for query in queries]
+        missing = {}
+        for key, query in zip(keys, queries):
+            if key not in self._searches:
+                missing.setdefault(key, query)
+        if missing:
+            batch = asyncio.ensure_future(asearch_many(list(missing.values()), date, top_k=top_k))
+            for index, key in enumerate(missing):
+                self._searches[key] = asyncio.ensure_future(self._result(batch, index))
+        return [asyncio.shield(self._searches[key]) for key in keys]
+
+    @staticmethod
+    async def _result(batch: asyncio.Future, index: int):
+        return (await batch)[index]
+
+    def scrape(self, url: str) -> asyncio.Future:
+        if url not in self._pages:
+            self._pages[url] = asyncio.ensure_future(ascrape_url_content(url))
+        return asyncio.shield(self._pages[url])
+
+    def stats(self) -> dict:
+        return {"searches": len(self._searches), "pages": len(self._pages)}
+
+
+@dataclass
+class VerificationEvent:
+    """
+    Progress event from a running verification.
+
+    kind is one of: plan, search_results, evidence, reasoning, verdict, result
+    """
+    kind: str
+    data: dict = field(default_factory=dict)
+    elapsed: float = 0.0  # Seconds since the verification started
+
 
 class ClaimCheckVerifier:
     """Original ClaimCheck FactChecker logic"""
-    
-    def __init__(self, claim: str, date: str, max_actions: int = 2):
+
+    def __init__(self, claim: str, date: str, max_actions: int = 2,
+                 fetcher: Optional[EvidenceFetcher] = None,
+                 on_event: Optional[Callable[[VerificationEvent], None]] = None,
+                 claim_id: Optional[str] = None):
         self.claim = claim
         self.date = date
         self.max_actions = max_actions
+        self.fetcher = fetcher or EvidenceFetcher()
+        self.on_event = on_event
+        self.started_at = time.monotonic()
         self.identifier = datetime.now().strftime("%m%d%Y%H%M%S")
-        
+        self.claim_id = claim_id or hashlib.sha256(claim.encode()).hexdigest()[:12]
+        self.usage = StageStats(self.claim_id)
+
         # In-memory report (no file saving)
         self.report = {
             "claim": self.claim,
@@ -35,278 +121,386 @@ class ClaimCheckVerifier:
             "judged_verdict": None,
             "verdict": None
         }
-        
-        self.record_text = f"# Claim: {claim}\n\n"
-    
+
+        # Record shared with the prompts. Keys are (round, phase, action, url) so
+        # concurrently gathered evidence renders in plan order, not arrival order
+        self.ledger = EvidenceLedger(claim)
+
     def get_report(self) -> str:
         """Get current report as markdown text"""
-        return self.record_text
-    
-    def append_to_report(self, text: str):
-        """Append to report"""
-        self.record_text += text + "\n\n"
-    
-    def process_action_line(self, line: str):
+        return self.ledger.render()
+
+    def emit(self, kind: str, **data):
+        if self.on_event:
+            self.on_event(VerificationEvent(kind, data, time.monotonic() - self.started_at))
+
+    def extract_action_lines(self, actions: str) -> List[str]:
+        """Extract planned action lines (original regex), limited to max_actions"""
+        action_lines = [x.strip() for x in actions.split('\n')]
+        action_lines = [
+            line for line in action_lines
+            if re.match(r'(\w+)_search\("([^"]+)"\)', line, re.IGNORECASE)
+        ]
+
+        logger.info(f"Extracted {len(action_lines)} action lines")
+
+        # Limit to max_actions (original behavior)
+        if action_lines and len(action_lines) > self.max_actions:
+            logger.info(f"Limiting to {self.max_actions} actions")
+            action_lines = action_lines[:self.max_actions]
+
+        return action_lines
+
+    @staticmethod
+    def extract_reasoning_actions(reasoning: str) -> List[str]:
+        """Extract follow-up actions proposed by the reasoning step (original regex)"""
+        reasoning_action_lines = [x.strip() for x in reasoning.split('\n')]
+        return [
+            line for line in reasoning_action_lines
+            if re.match(r'(web_search\("([^"]+)"\)|NONE)', line, re.IGNORECASE)
+        ]
+
+    @staticmethod
+    def extract_verdict(verdict: str) -> str:
+        """Extract verdict from backticks (original method)"""
+        extracted_verdict = re.search(r'`(.*?)`', verdict, re.DOTALL)
+        return extracted_verdict.group(1).strip() if extracted_verdict else ''
+
+    @staticmethod
+    def fallback_verdict(verdict: str) -> str:
+        """Fallback extraction (original logic) - most mentioned decision option"""
+        option_counts = {}
+        for option in ALLOWED_VERDICTS:
+            count = verdict.lower().count(option.lower())
+            if count > 0:
+                option_counts[option] = count
+
+        if option_counts:
+            pred_verdict = max(option_counts, key=option_counts.get)
+            logger.info(f"Fallback verdict: {pred_verdict}")
+            return pred_verdict
+        return "Not Enough Evidence"
+
+    def start_action(self, line: str) -> Optional[tuple]:
+        """Register a web_search action line, returns (identifier, query) or None"""
+        m = re.match(r'(\w+)_search\("([^"]+)"\)', line)
+        if not m:
+            return None
+
+        action, query = m.groups()
+        identifier = f'{action}: {query}'
+
+        # Skip duplicates (original behavior)
+        if identifier in self.report["actions"]:
+            logger.info(f"Skipping duplicate action: {identifier}")
+            return None
+
+        if action != 'web':
+            return None
+
+        self.report["actions"][identifier] = {
+            "action": "web_search",
+            "query": query,
+            "results": {}
+        }
+        return identifier, query
+
+    def record_search_results(self, identifier: str, urls: List[str], snippets: List[str]):
+        """Initialize action results with snippets"""
+        for url, snippet in zip(urls, snippets):
+            self.report["actions"][identifier]["results"][url] = {
+                "snippet": snippet,
+                "url": url,
+                "summary": None
+            }
+
+    def record_evidence(self, identifier: str, query: str, url: str, summary: str, key: tuple):
+        """Store a relevant evidence summary"""
+        logger.info(f"Evidence from {url}: {summary[:100]}...")
+        self.report["actions"][identifier]["results"][url]["summary"] = summary
+        self.ledger.add(key, EVIDENCE, f"### Evidence\n\nweb_search('{query}') summary: {summary}", url=url)
+        self.emit("evidence", query=query, url=url, summary=summary)
+
+    async def agather_evidence(self, identifier: str, query: str, search: Awaitable, key: tuple):
+        """Await an action's search results, then scrape and summarize each page"""
+        try:
+            # Search (original: top_k=3)
+            urls, snippets = await search
+            logger.info(f"Found {len(urls)} URLs for query: {query}")
+            self.record_search_results(identifier, urls, snippets)
+            self.emit("search_results", query=query, urls=urls, snippets=snippets)
+
+            async def process_result(url_index, url):
+                scraped_content = await self.fetcher.scrape(url)
+                if not scraped_content or scraped_content == "Unable to Scrape":
+                    logger.info(f"Failed to scrape: {url}")
+                    return
+
+                summary = await asummarize_evidence(
+                    self.claim,
+                    scraped_content,
+                    url,
+                    record=self.ledger,
+                    query=query
+                )
+
+                # Original: skip if "NONE"
+                if "NONE" in summary:
+                    logger.info(f"Skipping irrelevant evidence: {url}")
+                    return
+
+                self.record_evidence(identifier, query, url, summary, key + (url_index,))
+
+            await asyncio.gather(*(process_result(i, url) for i, url in enumerate(urls)))
+
+        except LLMCacheMiss:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing action '{identifier}': {e}")
+
+    async def aprocess_action_lines(self, action_lines: List[str], round_no: int):
+        """Run a planning or reasoning round; its searches go out as one batch"""
+        started = [(i, self.start_action(line)) for i, line in enumerate(action_lines)]
+        started = [(i, action) for i, action in started if action]
+        searches = self.fetcher.search_many([query for _, (_, query) in started], self.date, top_k=3)
+        await asyncio.gather(*(
+            self.agather_evidence(identifier, query, search, (round_no, 1, i))
+            for (i, (identifier, query)), search in zip(started, searches)
+        ))
+
+    async def ajudge_with_retries(self) -> Tuple[str, str]:
+        """Original judge loop: up to 3 tries to get a backticked verdict, then fallback"""
+        max_judge_tries = 3  # Original: 3 tries
+        judge_tries = 0
+        pred_verdict = ''
+
+        while judge_tries < max_judge_tries:
+            verdict = await ajudge_verdict(
+                record=self.ledger,
+                decision_options=DECISION_OPTIONS,
+                rules=RULES_PROMPT,
+                sample=judge_tries  # A retry must not get the cached failed reply back
+            )
+
+            logger.info(f"Judge attempt {judge_tries + 1}")
+
+            pred_verdict = self.extract_verdict(verdict)
+            if pred_verdict in ALLOWED_VERDICTS:
+                break
+
+            judge_tries += 1
+
+        if pred_verdict not in ALLOWED_VERDICTS:
+            logger.warning("Verdict extraction failed, using fallback")
+            pred_verdict = self.fallback_verdict(verdict)
+
+        return pred_verdict, verdict
+
+    async def ajudge_sample(self, sample: int) -> Tuple[str, str]:
+        """One independent judgement, returns (verdict, judgement)"""
+        if JUDGE_MODE == "structured":
+            pred_verdict, verdict = await ajudge_structured(self.ledger, DECISION_OPTIONS, RULES_PROMPT, sample)
+        else:
+            verdict = await ajudge_verdict(self.ledger, DECISION_OPTIONS, RULES_PROMPT, sample)
+            pred_verdict = self.extract_verdict(verdict)
+
+        if pred_verdict not in ALLOWED_VERDICTS:
+            # Failed call or a provider ignoring the schema
+            pred_verdict = self.fallback_verdict(verdict)
+        return pred_verdict, verdict
+
+    async def ajudge_vote(self) -> Tuple[str, str]:
         """
-        Process a single search action
-        EXACT original ClaimCheck logic
+        JUDGE_SAMPLES judgements in parallel, majority verdict wins (ties go
+        to the earliest sample). Votes are kept in the report.
         """
+        samples = await asyncio.gather(*(self.ajudge_sample(i) for i in range(JUDGE_SAMPLES)))
+        return self.tally_votes(samples)
+
+    def tally_votes(self, samples: List[Tuple[str, str]]) -> Tuple[str, str]:
+        """Majority (verdict, judgement) of judge samples, ties going to the earliest"""
+        votes = collections.Counter(pred_verdict for pred_verdict, _ in samples)
+        top = max(votes.values())
+        pred_verdict, verdict = next(sample for sample in samples if votes[sample[0]] == top)
+        if len(samples) > 1:
+            self.report["votes"] = dict(votes)
+            logger.info(f"Judge votes: {dict(votes)}")
+        return pred_verdict, verdict
+
+    def build_result(self, pred_verdict: str, verdict: str) -> dict:
+        """Map the ClaimCheck report to the agent result format"""
+        all_evidence = []
+        all_sources = []
+
+        for action_data in self.report["actions"].values():
+            for url, result in action_data.get("results", {}).items():
+                if result.get("summary"):
+                    all_evidence.append(result["summary"])
+                    all_sources.append(url)
+
+        logger.info(f"Final result: {pred_verdict}, {len(all_sources)} sources")
+
+        # Format evidence with bullet points for readability
+        if all_evidence:
+            evidence_formatted = "\n\n".join([f"• {ev}" for ev in all_evidence])
+        else:
+            evidence_formatted = "No relevant evidence found"
+
+        # Format reasoning with bullet points
+        if self.report["reasoning"]:
+            reasoning_formatted = "\n\n".join([f"**Analysis:** {r}" for r in self.report["reasoning"]])
+        else:
+            reasoning_formatted = verdict
+
+        result = {
+            "claim": self.claim,
+            "verification_status": STATUS_MAPPING.get(pred_verdict, "unverifiable"),
+            "confidence": CONFIDENCE_MAPPING.get(pred_verdict, 20),
+            "evidence": evidence_formatted,
+            "sources": all_sources,
+            "reasoning": reasoning_formatted
+        }
+
+        votes = self.report.get("votes")
+        if votes:
+            # Split votes lower confidence in proportion to the disagreement
+            result["confidence"] = round(result["confidence"] * votes[pred_verdict] / sum(votes.values()))
+            result["votes"] = votes
+        result["usage"] = self.usage.summary()
+        return result
+
+    def error_result(self, e: Exception) -> dict:
+        logger.error(f"ClaimCheck verification failed: {e}", exc_info=True)
+        return {
+            "claim": self.claim,
+            "verification_status": "unverifiable",
+            "confidence": 0,
+            "evidence": f"Error during verification: {str(e)}",
+            "sources": [],
+            "reasoning": "Verification process encountered an error",
+            "usage": self.usage.summary()
+        }
+
+    async def arun(self) -> dict:
+        """Execute full ClaimCheck pipeline, accounting every LLM call to this claim"""
+        token = claim_usage.set(self.usage)
         try:
-            m = re.match(r'(\w+)_search\("([^"]+)"\)', line)
-            if not m:
-                return
-            
-            action, query = m.groups()
-            identifier = f'{action}: {query}'
-            
-            # Skip duplicates (original behavior)
-            if identifier in self.report["actions"]:
-                logger.info(f"Skipping duplicate action: {identifier}")
-                return
-            
-            if action == 'web':
-                action_entry = {
-                    "action": "web_search",
-                    "query": query,
-                    "results": {}
-                }
-                self.report["actions"][identifier] = action_entry
-                
-                # Search (original: top_k=3)
-                urls, snippets = web_search(query, self.date, top_k=3)
-                
-                logger.info(f"Found {len(urls)} URLs for query: {query}")
-                
-                # Initialize results with snippets
-                for url, snippet in zip(urls, snippets):
-                    self.report["actions"][identifier]["results"][url] = {
-                        "snippet": snippet,
-                        "url": url,
-                        "summary": None
-                    }
-                
-                # Process each result (original uses ThreadPoolExecutor)
-                def process_result(url):
-                    scraped_content = scrape_url_content(url)
-                    if not scraped_content or scraped_content == "Unable to Scrape":
-                        logger.info(f"Failed to scrape: {url}")
-                        return
-                    
-                    summary = summarize_evidence(
-                        self.claim,
-                        scraped_content,
-                        url,
-                        record=self.get_report()
-                    )
-                    
-                    # Original: skip if "NONE"
-                    if "NONE" in summary:
-                        logger.info(f"Skipping irrelevant evidence: {url}")
-                        return
-                    
-                    logger.info(f"Evidence from {url}: {summary[:100]}...")
-                    
-                    # Update report
-                    self.report["actions"][identifier]["results"][url]["summary"] = summary
-                    self.append_to_report(f"### Evidence\n\nweb_search('{query}') summary: {summary}")
-                
-                # Parallel processing (original behavior)
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    list(executor.map(process_result, urls))
-        
-        except Exception as e:
-            logger.error(f"Error processing action line '{line}': {e}")
-    
-    def run(self) -> dict:
+            return await self._arun()
+        finally:
+            claim_usage.reset(token)
+
+    async def _arun(self) -> dict:
         """
         Execute full ClaimCheck pipeline
         EXACT original logic with up to 3 iterations
         """
         try:
             # === STEP 1: PLANNING ===
-            actions = plan_searches(self.claim, record=self.get_report())
-            self.append_to_report(f"## Iteration 1: Actions\n\n{actions}")
+            actions = await aplan_searches(self.claim, record=self.ledger)
+            self.ledger.add((0, 0), ACTIONS, f"## Iteration 1: Actions\n\n{actions}")
             logger.info(f"Proposed actions:\n{actions}")
-            
-            # Extract action lines (original regex)
-            action_lines = [x.strip() for x in actions.split('\n')]
-            action_lines = [
-                line for line in action_lines 
-                if re.match(r'(\w+)_search\("([^"]+)"\)', line, re.IGNORECASE)
-            ]
-            
-            logger.info(f"Extracted {len(action_lines)} action lines")
-            
-            # Limit to max_actions (original behavior)
-            if action_lines and len(action_lines) > self.max_actions:
-                logger.info(f"Limiting to {self.max_actions} actions")
-                action_lines = action_lines[:self.max_actions]
-            
+
+            action_lines = self.extract_action_lines(actions)
+            self.emit("plan", actions=action_lines)
+
             # === STEP 2: INITIAL EVIDENCE GATHERING ===
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                list(executor.map(self.process_action_line, action_lines))
-            
+            await self.aprocess_action_lines(action_lines, round_no=0)
+
             # === STEP 3: ITERATIVE REFINEMENT (up to 2 more iterations) ===
             iterations = 0
             seen_action_lines = set(action_lines)
-            
+
             while iterations <= 2:  # Original: iterations <= 2
                 # Synthesize reasoning
-                reasoning = develop_reasoning(record=self.get_report())
+                reasoning = await adevelop_reasoning(record=self.ledger)
                 logger.info(f"Iteration {iterations + 1} reasoning generated")
-                
-                self.append_to_report(f"### Reasoning\n\n{reasoning}")
+
+                self.ledger.add((iterations, 2), REASONING, f"### Reasoning\n\n{reasoning}")
                 self.report["reasoning"].append(reasoning)
-                
-                # Check if more evidence needed (original regex)
-                reasoning_action_lines = [x.strip() for x in reasoning.split('\n')]
-                reasoning_action_lines = [
-                    line for line in reasoning_action_lines 
-                    if re.match(r'(web_search\("([^"]+)"\)|NONE)', line, re.IGNORECASE)
-                ]
-                
+
+                # Check if more evidence needed
+                reasoning_action_lines = self.extract_reasoning_actions(reasoning)
                 logger.info(f"Extracted {len(reasoning_action_lines)} reasoning actions")
-                
+                self.emit("reasoning", iteration=iterations + 1, reasoning=reasoning, actions=reasoning_action_lines)
+
                 # Stop if NONE or no actions (original behavior)
                 if not reasoning_action_lines or (
-                    len(reasoning_action_lines) == 1 and 
+                    len(reasoning_action_lines) == 1 and
                     reasoning_action_lines[0].strip().lower() == 'none'
                 ):
                     logger.info("No more evidence needed")
                     break
-                
+
                 # Stop if duplicate actions (original behavior)
                 if any(line in seen_action_lines for line in reasoning_action_lines):
                     logger.info("Duplicate actions detected, stopping")
                     break
-                
+
                 seen_action_lines.update(reasoning_action_lines)
-                
+
                 # Gather more evidence
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    list(executor.map(self.process_action_line, reasoning_action_lines))
-                
+                await self.aprocess_action_lines(reasoning_action_lines, round_no=iterations + 1)
+
                 iterations += 1
-            
+
             # === STEP 4: FINAL VERDICT ===
-            allowed_verdicts = {
-                "Supported", "Refuted", 
-                "Conflicting Evidence/Cherrypicking", 
-                "Not Enough Evidence"
-            }
-            
-            max_judge_tries = 3  # Original: 3 tries
-            judge_tries = 0
-            pred_verdict = ''
-            
-            while judge_tries < max_judge_tries:
-                verdict = judge_verdict(
-                    record=self.get_report(),
-                    decision_options="Supported|Refuted|Conflicting Evidence/Cherrypicking|Not Enough Evidence",
-                    rules=RULES_PROMPT
-                )
-                
-                logger.info(f"Judge attempt {judge_tries + 1}")
-                
-                # Extract verdict from backticks (original method)
-                extracted_verdict = re.search(r'`(.*?)`', verdict, re.DOTALL)
-                pred_verdict = extracted_verdict.group(1).strip() if extracted_verdict else ''
-                
-                if pred_verdict in allowed_verdicts:
-                    break
-                
-                judge_tries += 1
-            
-            # Fallback extraction (original logic)
-            if pred_verdict not in allowed_verdicts:
-                logger.warning("Verdict extraction failed, using fallback")
-                option_counts = {}
-                for option in allowed_verdicts:
-                    count = verdict.lower().count(option.lower())
-                    if count > 0:
-                        option_counts[option] = count
-                
-                if option_counts:
-                    pred_verdict = max(option_counts, key=option_counts.get)
-                    logger.info(f"Fallback verdict: {pred_verdict}")
-                else:
-                    pred_verdict = "Not Enough Evidence"
-            
-            self.append_to_report(f"### Verdict\n\n{verdict}")
+            if JUDGE_MODE == "structured" or JUDGE_SAMPLES > 1:
+                pred_verdict, verdict = await self.ajudge_vote()
+            else:
+                pred_verdict, verdict = await self.ajudge_with_retries()
+
+            self.ledger.add((iterations + 1, 3), VERDICT, f"### Verdict\n\n{verdict}")
             self.report["judged_verdict"] = verdict
             self.report["verdict"] = pred_verdict
-            
-            # === MAP TO AGENT FORMAT ===
-            status_mapping = {
-                "Supported": "verified",
-                "Refuted": "false",
-                "Conflicting Evidence/Cherrypicking": "disputed",
-                "Not Enough Evidence": "unverifiable"
-            }
-            
-            confidence_mapping = {
-                "Supported": 90,
-                "Refuted": 90,
-                "Conflicting Evidence/Cherrypicking": 50,
-                "Not Enough Evidence": 20
-            }
-            
-            # Extract evidence and sources
-            all_evidence = []
-            all_sources = []
-            
-            for action_data in self.report["actions"].values():
-                for url, result in action_data.get("results", {}).items():
-                    if result.get("summary"):
-                        all_evidence.append(result["summary"])
-                        all_sources.append(url)
-            
-            logger.info(f"Final result: {pred_verdict}, {len(all_sources)} sources")
-            
-            # Format evidence with bullet points for readability
-            if all_evidence:
-                evidence_formatted = "\n\n".join([f"• {ev}" for ev in all_evidence])
-            else:
-                evidence_formatted = "No relevant evidence found"
-            
-            # Format reasoning with bullet points
-            if self.report["reasoning"]:
-                reasoning_formatted = "\n\n".join([f"**Analysis:** {r}" for r in self.report["reasoning"]])
-            else:
-                reasoning_formatted = verdict
-            
-            return {
-                "claim": self.claim,
-                "verification_status": status_mapping.get(pred_verdict, "unverifiable"),
-                "confidence": confidence_mapping.get(pred_verdict, 20),
-                "evidence": evidence_formatted,
-                "sources": all_sources,
-                "reasoning": reasoning_formatted
-            }
-        
+            self.emit("verdict", verdict=pred_verdict, judgement=verdict, votes=self.report.get("votes"))
+
+            return self.build_result(pred_verdict, verdict)
+
+        except LLMCacheMiss:
+            raise  # Replay runs must not pass off a missing response as a verdict
         except Exception as e:
-            logger.error(f"ClaimCheck verification failed: {e}", exc_info=True)
-            return {
-                "claim": self.claim,
-                "verification_status": "unverifiable",
-                "confidence": 0,
-                "evidence": f"Error during verification: {str(e)}",
-                "sources": [],
-                "reasoning": "Verification process encountered an error"
-            }
+            return self.error_result(e)
 
+    def run(self) -> dict:
+        """Blocking entry point for callers without an event loop"""
+        return scheduler.run(self.arun())
 
-def verify_claim_advanced(claim: str, date: Optional[str] = None) -> dict:
+
+def _search_date(date: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Returns (date, cutoff): date defaults to today, cutoff is None unless a day other than today was asked for"""
+    today = datetime.now().strftime("%d-%m-%Y")
+    if not date or date == today:
+        return today, None
+    return date, date
+
+
+async def _averify(verifier: ClaimCheckVerifier, cutoff: Optional[str]) -> dict:
+    """Reuse a fresh verdict for a near-duplicate claim searched with the same cutoff, otherwise run the pipeline"""
+    cached = await verdict_index.alookup(verifier.claim, cutoff)
+    if cached:
+        cached["usage"] = verifier.usage.summary()  # A reused verdict costs nothing
+        return cached
+
+    result = await verifier.arun()
+    result["cache_hit"] = False
+    # Errors and "unverifiable" may just be transient search failures, so don't reuse them
+    if result["confidence"] > 0 and result["verification_status"] != "unverifiable":
+        # Usage and votes describe this run, not the verdict
+        verdict_index.add(verifier.claim, {k: v for k, v in result.items() if k not in ("usage", "votes")}, cutoff)
+    return result
+
+
+async def averify_claim_advanced(claim: str, date: Optional[str] = None) -> dict:
     """
     State-of-the-art fact-checking using ClaimCheck methodology.
-    
+
     Performs iterative evidence gathering (up to 3 rounds), web search with date filtering,
     full article scraping, multi-stage reasoning synthesis, and strict verdict judgment.
-    
+
     Args:
         claim: The claim to verify (required)
         date: Date in DD-MM-YYYY format, defaults to today if not provided
-    
+
     Returns:
         dict with keys:
             - verification_status: verified|false|disputed|unverifiable
@@ -314,13 +508,71 @@ def verify_claim_advanced(claim: str, date: Optional[str] = None) -> dict:
             - evidence: Summary of all evidence found
             - sources: List of source URLs
             - reasoning: Detailed reasoning for the verdict
+            - cache_hit: True if a stored verdict for a near-identical claim was reused
     """
-    if not date:
-        date = datetime.now().strftime("%d-%m-%Y")
-    
+    date, cutoff = _search_date(date)
+
     verifier = ClaimCheckVerifier(claim=claim, date=date, max_actions=3)  # Allow more initial searches
-    return verifier.run()
+    return await _averify(verifier, cutoff)
+
+
+def verify_claim_advanced(claim: str, date: Optional[str] = None) -> dict:
+    """Blocking variant of averify_claim_advanced"""
+    return scheduler.run(averify_claim_advanced(claim, date))
+
+
+async def astream_verify_claim(claim: str, date: Optional[str] = None) -> AsyncIterator[VerificationEvent]:
+    """
+    Streaming variant of averify_claim_advanced.
+
+    Yields VerificationEvents as the pipeline progresses (plan, search_results,
+    evidence, reasoning, verdict) and finally a "result" event whose data is
+    the same dict averify_claim_advanced returns. A reused near-duplicate
+    verdict yields only the result event. Closing the iterator early cancels
+    the verification.
+    """
+    date, cutoff = _search_date(date)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    verifier = ClaimCheckVerifier(claim=claim, date=date, max_actions=3, on_event=queue.put_nowait)
+    task = asyncio.ensure_future(_averify(verifier, cutoff))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        yield VerificationEvent("result", task.result(), time.monotonic() - verifier.started_at)
+    finally:
+        task.cancel()
+
+
+async def averify_claims_batch(claims: List[str], date: Optional[str] = None) -> List[dict]:
+    """
+    Verify several claims (e.g. all claims from one article) together.
+
+    Every claim runs the full ClaimCheck pipeline, but all verifiers share one
+    EvidenceFetcher, so a web_search query or URL planned by several claims is
+    searched and scraped once. Summaries, reasoning and verdicts stay per claim.
+
+    Returns:
+        List of result dicts in the same order and format as verify_claim_advanced
+    """
+    date, cutoff = _search_date(date)
+
+    fetcher = EvidenceFetcher()
+    verifiers = [
+        ClaimCheckVerifier(claim=claim, date=date, max_actions=3, fetcher=fetcher)
+        for claim in claims
+    ]
+    results = await asyncio.gather(*(_averify(verifier, cutoff) for verifier in verifiers))
+    logger.info(f"Batch verified {len(claims)} claims with {fetcher.stats()}")
+    return list(results)
+
+
+def verify_claims_batch(claims: List[str], date: Optional[str] = None) -> List[dict]:
+    """Blocking variant of averify_claims_batch"""
+    return scheduler.run(averify_claims_batch(claims, date))
 
 
-# Create ADK FunctionTool
-claimcheck_tool = FunctionTool(verify_claim_advanced)
+# Create ADK FunctionTool (async, runs on the ADK event loop)
+claimcheck_tool = FunctionTool(averify_claim_advanced)
@@ -0,0 +1,232 @@
+"""Page fetching - pooled HTTP clients, global and per-domain limits, real timeouts, per-domain stats"""
+import time
+import asyncio
+import logging
+import threading
+import collections
+import httpx
+from typing import Dict, Mapping, Tuple
+from urllib.parse import urlsplit
+from .config import (
+    HTTP_POOL_HOSTS, HTTP_KEEPALIVE_EXPIRY, HTTP_RETRIES, HTTP_BACKOFF,
+    DOMAIN_CONCURRENCY, DOMAIN_RPM, DOMAIN_BURST, MAX_PAGE_BYTES
+)
+from .ratelimit import TokenBucket
+from .scheduler import scheduler, Lane
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_TIMEOUT = 15  # Original uses 15s
+RETRY_STATUS = (429, 500, 502, 503, 504)
+CHUNK_SIZE = 64 * 1024
+MAX_DOMAINS = 1024  # Idle domains beyond this are forgotten, oldest first
+LATENCY_WINDOW = 100
+PAGE_TYPES = {"text/html", "application/xhtml+xml", "text/plain"}
+
+
+class UnsupportedContent(Exception):
+    """Response skipped from its headers: not a text page, or declared larger than MAX_PAGE_BYTES"""
+
+
+def _check_headers(url: str, headers: Mapping[str, str]):
+    content_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type and content_type not in PAGE_TYPES:
+        raise UnsupportedContent(f"{url}: {content_type}")
+    length = headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > MAX_PAGE_BYTES:
+        raise UnsupportedContent(f"{url}: {length} bytes")
+
+
+def _async_client(name: str) -> httpx.AsyncClient:
+    # Pooled connections belong to the loop that opened them; the transport retries failed connects
+    return scheduler.loop_resource(f"http:{name}", lambda: httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=SCRAPE_TIMEOUT,
+        transport=httpx.AsyncHTTPTransport(
+            retries=HTTP_RETRIES,
+            limits=httpx.Limits(
+                max_keepalive_connections=HTTP_POOL_HOSTS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+    ))
+
+
+async def _asend(name: str, method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+    """
+    Request on the shared async client, retrying 429/5xx responses with
+    backoff. Streamed responses must be closed by the caller.
+    """
+    client = _async_client(name)
+    for attempt in range(HTTP_RETRIES + 1):
+        response = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+        if response.status_code not in RETRY_STATUS or attempt == HTTP_RETRIES:
+            return response
+        delay = HTTP_BACKOFF * 2 ** attempt
+        hinted = response.headers.get("Retry-After", "")
+        if hinted.isdigit():
+            delay = max(delay, min(float(hinted), SCRAPE_TIMEOUT))
+        await response.aclose()
+        await asyncio.sleep(delay)
+
+
+class Domain:
+    """Concurrency slots, request pacing and outcome counters for one host"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lane = Lane(name, DOMAIN_CONCURRENCY)
+        self._bucket = TokenBucket(DOMAIN_RPM, burst=DOMAIN_BURST) if DOMAIN_RPM > 0 else None
+        self._lock = threading.Lock()
+        self.counts = collections.Counter()
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def _reserve(self) -> float:
+        if not self._bucket:
+            return 0.0
+        with self._lock:
+            return self._bucket.reserve(1, time.monotonic())
+
+    def _refund(self):
+        with self._lock:
+            self._bucket.refund(1)
+
+    async def apace(self):
+        wait = self._reserve()
+        if wait <= 0:
+            return
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._refund()
+            raise
+
+    def record(self, outcome: str, latency: float):
+        """outcome: ok, http_errors, rejected, timeouts or errors"""
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts[outcome] += 1
+            self._latencies.append(latency)
+
+    def count(self, event: str):
+        with self._lock:
+            self.counts[event] += 1
+
+    def idle(self) -> bool:
+        lane = self.lane.stats()
+        return not lane["active"] and not lane["queued"]
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            requests_made = self.counts["requests"]
+            failed = self.counts["http_errors"] + self.counts["timeouts"] + self.counts["errors"]
+            return {
+                "requests": requests_made,
+                "ok": self.counts["ok"],
+                "http_errors": self.counts["http_errors"],
+                "rejected": self.counts["rejected"],
+                "truncated": self.counts["truncated"],
+                "timeouts": self.counts["timeouts"],
+                "errors": self.counts["errors"],
+                "error_rate": failed / requests_made if requests_made else 0.0,
+                "avg_latency_s": sum(latencies) / len(latencies) if latencies else 0.0,
+                "p95_latency_s": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else 0.0,
+                "queued": self.lane.stats()["queued"],
+            }
+
+
+class PageFetcher:
+    """
+    Page downloads within the global scrape lane plus per-domain limits
+    (DOMAIN_CONCURRENCY in flight, DOMAIN_RPM with DOMAIN_BURST). A domain
+    slot is taken before the global one, so a busy site queues on its own
+    instead of holding global slots. SCRAPE_TIMEOUT covers the whole
+    download: the request is cancelled when it runs out.
+
+    Bodies are streamed and only read for successful text responses, up to
+    MAX_PAGE_BYTES; anything else is refused from its headers with
+    UnsupportedContent before the body is downloaded.
+    """
+
+    def __init__(self):
+        self._domains: Dict[str, Domain] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def domain(self, url: str) -> Domain:
+        name = (urlsplit(url).hostname or "").lower()
+        with self._lock:
+            domain = self._domains.get(name)
+            if domain is None:
+                domain = self._domains[name] = Domain(name)
+                if len(self._domains) > MAX_DOMAINS:
+                    stale = next((d for d in self._domains.values() if d.idle()), None)
+                    if stale:
+                        del self._domains[stale.name]
+            return domain
+
+    def _append(self, domain: Domain, body: bytearray, chunk: bytes) -> bool:
+        """Append a chunk, returns True once the body reached MAX_PAGE_BYTES"""
+        body.extend(chunk)
+        if len(body) < MAX_PAGE_BYTES:
+            return False
+        del body[MAX_PAGE_BYTES:]
+        domain.count("truncated")
+        return True
+
+    async def _adownload(self, domain: Domain, url: str, headers: dict) -> Tuple[int, Mapping[str, str], bytes]:
+        response = await _asend("scrape", "GET", url, stream=True, headers=headers)
+        try:
+            body = bytearray()
+            if response.is_success:
+                _check_headers(url, response.headers)
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    if self._append(domain, body, chunk):
+                        break
+            return response.status_code, response.headers, bytes(body)
+        finally:
+            await response.aclose()
+
+    async def afetch(self, url: str, headers: dict) -> Tuple[int, Mapping[str, str], bytes]:
+        """
+        GET, returns (status, headers, body); the body is empty for non-2xx
+        responses. Raises asyncio.TimeoutError past SCRAPE_TIMEOUT, after
+        cancelling the request, and when the client itself times out.
+        """
+        domain = self.domain(url)
+        async with domain.lane.aslot():
+            await domain.apace()
+            async with scheduler.aslot("scrape"):
+                start = time.monotonic()
+                try:
+                    status, response_headers, content = await asyncio.wait_for(
+                        self._adownload(domain, url, headers),
+                        timeout=SCRAPE_TIMEOUT
+                    )
+                except UnsupportedContent:
+                    domain.record("rejected", time.monotonic() - start)
+                    raise
+                except asyncio.TimeoutError:
+                    domain.record("timeouts", time.monotonic() - start)
+                    raise
+                except httpx.TimeoutException as e:
+                    # The client's own timeout equals SCRAPE_TIMEOUT and can fire first
+                    domain.record("timeouts", time.monotonic() - start)
+                    raise asyncio.TimeoutError(str(e)) from e
+                except Exception:
+                    domain.record("errors", time.monotonic() - start)
+                    raise
+                domain.record("http_errors" if status >= 400 else "ok", time.monotonic() - start)
+                return status, response_headers, content
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            domains = list(self._domains.values())
+        return {domain.name: domain.stats() for domain in domains if domain.counts["requests"]}
+
+
+page_fetcher = PageFetcher()
+
+
+def domain_stats() -> Dict[str, dict]:
+    return page_fetcher.stats()
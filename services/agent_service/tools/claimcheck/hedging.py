@@ -0,0 +1,69 @@
+"""Latency tracking and counters for hedged, failover-capable LLM requests"""
+import threading
+import collections
+from typing import Dict
+
+from .config import LLM_HEDGE_PERCENTILE, LLM_HEDGE_DEFAULT_DELAY
+
+MIN_SAMPLES = 20
+WINDOW = 200
+
+
+class HedgeStats:
+    """
+    Recent per-provider latencies, used to decide when a primary call is
+    slow enough to hedge, plus hedge, failover and win counts.
+    """
+
+    def __init__(self, percentile: float, default_delay: float):
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, collections.deque] = collections.defaultdict(
+            lambda: collections.deque(maxlen=WINDOW)
+        )
+        self.counts = collections.Counter()
+        self.wins = collections.Counter()
+
+    def observe(self, provider: str, latency: float):
+        with self._lock:
+            self._latencies[provider].append(latency)
+
+    def _delay(self, samples: collections.deque) -> float:
+        if len(samples) < MIN_SAMPLES:
+            return self.default_delay
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+
+    def delay(self, provider: str) -> float:
+        """Seconds to wait on `provider` before hedging: its recent latency percentile"""
+        with self._lock:
+            return self._delay(self._latencies[provider])
+
+    def count(self, event: str):
+        with self._lock:
+            self.counts[event] += 1
+
+    def won(self, provider: str, hedged: bool, primary: bool):
+        with self._lock:
+            self.wins[provider] += 1
+            if hedged and not primary:
+                self.counts["hedge_wins"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.counts["requests"]
+            hedged = self.counts["hedged"]
+            return {
+                "requests": requests,
+                "hedged": hedged,
+                "hedge_rate": hedged / requests if requests else 0.0,
+                "hedge_win_rate": self.counts["hedge_wins"] / hedged if hedged else 0.0,
+                "failovers": self.counts["failovers"],
+                "failed": self.counts["failed"],
+                "wins": dict(self.wins),
+                "hedge_delay_s": {p: self._delay(samples) for p, samples in self._latencies.items()},
+            }
+
+
+hedge_stats = HedgeStats(LLM_HEDGE_PERCENTILE, LLM_HEDGE_DEFAULT_DELAY)
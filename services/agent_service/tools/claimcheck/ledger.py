@@ -0,0 +1,79 @@
+"""Structured, thread-safe record of a ClaimCheck run"""
+import bisect
+import threading
+from typing import List, Optional, Tuple
+
+# Entry kinds
+ACTIONS = "actions"
+EVIDENCE = "evidence"
+REASONING = "reasoning"
+VERDICT = "verdict"
+
+
+class LedgerEntry:
+    __slots__ = ("key", "kind", "text", "url")
+
+    def __init__(self, key: Tuple, kind: str, text: str, url: Optional[str] = None):
+        self.key = key
+        self.kind = kind
+        self.text = text
+        self.url = url
+
+    def render(self) -> str:
+        return self.text + "\n\n"
+
+
+class EvidenceLedger:
+    """
+    Ordered log of actions, evidence, reasoning and verdict entries.
+
+    Entries are sorted by a caller-supplied key rather than arrival time, so
+    evidence gathered concurrently always renders in the same order. The
+    markdown record is rendered lazily and cached; appends only render the
+    new entries, and an out-of-order insert re-renders from its position.
+    """
+
+    def __init__(self, claim: str):
+        self.claim = claim
+        self.header = f"# Claim: {claim}\n\n"
+        self._lock = threading.Lock()
+        self._entries: List[LedgerEntry] = []
+        self._keys: List[Tuple] = []
+        self._rendered = [self.header]
+        self._offsets: List[int] = []  # Length of the rendered text before each entry
+        self._rendered_len = len(self.header)
+
+    def add(self, key: Tuple, kind: str, text: str, url: Optional[str] = None) -> LedgerEntry:
+        entry = LedgerEntry(key, kind, text, url)
+        with self._lock:
+            position = bisect.bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._entries.insert(position, entry)
+            if position < len(self._offsets):
+                self._truncate(position)
+        return entry
+
+    def _truncate(self, position: int):
+        text = ''.join(self._rendered)[:self._offsets[position]]
+        self._rendered = [text]
+        self._rendered_len = len(text)
+        del self._offsets[position:]
+
+    def render(self) -> str:
+        """Markdown record in key order"""
+        with self._lock:
+            for entry in self._entries[len(self._offsets):]:
+                self._offsets.append(self._rendered_len)
+                chunk = entry.render()
+                self._rendered.append(chunk)
+                self._rendered_len += len(chunk)
+            if len(self._rendered) > 1:
+                self._rendered = [''.join(self._rendered)]
+            return self._rendered[0]
+
+    def entries(self, kind: Optional[str] = None) -> List[LedgerEntry]:
+        with self._lock:
+            return [e for e in self._entries if kind is None or e.kind == kind]
+
+    def __len__(self) -> int:
+        return len(self._entries)
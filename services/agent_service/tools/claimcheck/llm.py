@@ -1,81 +1,321 @@
 """LLM wrapper - supports OpenAI and Gemini"""
+import json
+import time
+import asyncio
+import hashlib
 import logging
+import httpx
+from typing import Awaitable, Callable, List, Optional, Tuple
+from .budget import estimate_tokens
+from .cache import TieredCache
 from .config import (
     USE_OPENAI, OPENAI_API_KEY, OPENAI_MODEL,
-    GEMINI_API_KEY, GEMINI_MODEL
+    GEMINI_API_KEY, GEMINI_MODEL, STAGE_MODELS, CACHE_DB_PATH,
+    LLM_CACHE_MODE, LLM_CACHE_SIZE, LLM_CACHE_MAX_BYTES,
+    LLM_CONCURRENCY, LLM_TIMEOUT, LLM_KEEPALIVE_EXPIRY, LLM_MAX_RETRIES,
+    LLM_FAILOVER, LLM_HEDGE
 )
+from .hedging import hedge_stats
+from .ratelimit import limiters, is_retryable
+from .scheduler import scheduler
+from .usage import Usage, record_usage
 
 logger = logging.getLogger(__name__)
 
-# Initialize APIs
-if USE_OPENAI and OPENAI_API_KEY:
+# Connection failures that never got a status code are worth retrying too
+TRANSIENT_ERRORS = (httpx.TransportError,)
+
+# Initialize APIs (both, when keyed, so either can take over for the other)
+if OPENAI_API_KEY:
     import openai
     openai.api_key = OPENAI_API_KEY
+    TRANSIENT_ERRORS += (openai.APIConnectionError,)
 
 if GEMINI_API_KEY:
     import google.generativeai as genai
     genai.configure(api_key=GEMINI_API_KEY)
 
+MAX_OUTPUT_TOKENS = 2048
 
-def prompt_llm(prompt: str, think: bool = True) -> str:
-    """
-    LLM wrapper matching original Ollama behavior
-    Supports both OpenAI and Gemini
-    """
-    
-    # Try OpenAI first if configured
-    if USE_OPENAI and OPENAI_API_KEY:
+# Match Ollama's generation config
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "top_k": 40,
+    "max_output_tokens": MAX_OUTPUT_TOKENS,
+}
+
+
+def _clean_output(output: str) -> str:
+    """Strip thinking tags (from original Ollama)"""
+    output = output.strip()
+    if '<think>' in output[:50]:
+        output = output.split('</think>')[-1].strip()
+    return output
+
+
+def _http_limits() -> httpx.Limits:
+    # The llm lane caps concurrent calls, so that many warm connections suffice
+    return httpx.Limits(
+        max_connections=LLM_CONCURRENCY * 2,
+        max_keepalive_connections=LLM_CONCURRENCY,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+    )
+
+
+def _async_openai_client():
+    # Async connections belong to the loop that opened them
+    return scheduler.loop_resource("openai", lambda: openai.AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        timeout=LLM_TIMEOUT,
+        max_retries=0,
+        http_client=openai.DefaultAsyncHttpxClient(limits=_http_limits(), timeout=LLM_TIMEOUT)
+    ))
+
+
+def _new_gemini_model(model: str):
+    import google.generativeai as genai
+    return genai.GenerativeModel(model, generation_config=GEMINI_GENERATION_CONFIG)
+
+
+def _async_gemini_model(model: str):
+    # The model's async gRPC channel is bound to the loop it was first used on
+    return scheduler.loop_resource(f"gemini:{model}", lambda: _new_gemini_model(model))
+
+
+def _model(stage: Optional[str], provider: Optional[str] = None) -> str:
+    """Model for a ClaimCheck stage; stage overrides apply to the primary provider only"""
+    primary = "openai" if USE_OPENAI and OPENAI_API_KEY else "gemini"
+    provider = provider or primary
+    if provider == primary and STAGE_MODELS.get(stage):
+        return STAGE_MODELS[stage]
+    return OPENAI_MODEL if provider == "openai" else GEMINI_MODEL
+
+
+def _gemini_prompt(prompt: str, think: bool) -> str:
+    if not think:
+        return "Respond directly without showing reasoning.\n\n" + prompt
+    return prompt
+
+
+def _usage(response) -> Optional[Usage]:
+    """Token usage reported by the provider, including prompt tokens served from its prefix cache"""
+    usage = getattr(response, "usage", None)  # OpenAI
+    if usage is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        return usage.prompt_tokens, usage.completion_tokens, getattr(details, "cached_tokens", None) or 0
+    metadata = getattr(response, "usage_metadata", None)  # Gemini
+    if metadata is not None:
+        return (metadata.prompt_token_count, metadata.candidates_token_count,
+                getattr(metadata, "cached_content_token_count", None) or 0)
+    return None
+
+
+def _total_tokens(response) -> Optional[int]:
+    usage = _usage(response)
+    return usage[0] + usage[1] if usage else None
+
+
+async def _acall(provider: str, prompt: str, request: Callable[[], Awaitable]):
+    """Run request() within the provider's rate limits, retrying transient errors"""
+    limiter = limiters[provider]
+    reserved = estimate_tokens(prompt) + MAX_OUTPUT_TOKENS
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        await limiter.aacquire(reserved)
         try:
-            client = openai.OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=2048
-            )
-            output = response.choices[0].message.content.strip()
-            
-            # Handle thinking tags (from original Ollama)
-            if '<think>' in output[:50]:
-                output = output.split('</think>')[-1].strip()
-            
-            return output
+            async with scheduler.aslot("llm"):
+                response = await request()
+            limiter.succeeded(reserved, _total_tokens(response))
+            return response
         except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            return ""
-    
-    # Fallback to Gemini
-    if not GEMINI_API_KEY:
+            if attempt == LLM_MAX_RETRIES or not is_retryable(e, TRANSIENT_ERRORS):
+                raise
+            delay = limiter.failed(e, attempt)
+            logger.warning(f"{provider} call failed ({e}), retry {attempt + 1}/{LLM_MAX_RETRIES} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+class LLMCacheMiss(RuntimeError):
+    """Replay mode found no recorded response for a prompt"""
+
+
+# Content-addressed responses, so re-running a fact-check (or a benchmark) can skip the provider
+llm_cache = TieredCache(
+    "llm",
+    max_entries=LLM_CACHE_SIZE,
+    ttl=None if LLM_CACHE_MODE in ("record", "replay") else 0,
+    db_path=CACHE_DB_PATH,
+    max_bytes=LLM_CACHE_MAX_BYTES
+)
+
+
+def _cache_key(prompt: str, think: bool, provider: str, model: str,
+               schema: Optional[dict] = None, sample: int = 0) -> str:
+    # Everything that shapes the response: provider, model, sampling parameters and the prompt sent
+    if provider == "openai":
+        request = ["openai", model, {"temperature": 0.7, "max_tokens": MAX_OUTPUT_TOKENS}, prompt]
+    else:
+        request = ["gemini", model, GEMINI_GENERATION_CONFIG, _gemini_prompt(prompt, think)]
+    request[-1] = hashlib.sha256(request[-1].encode()).hexdigest()
+    if schema or sample:
+        request += [schema, sample]  # Independent samples of the same prompt get their own entries
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+async def _cached_output(prompt: str, think: bool, stage: Optional[str],
+                         schema: Optional[dict], sample: int) -> Optional[Tuple[str, str]]:
+    """
+    Recorded (output, model). Responses are keyed by the provider that gave
+    them, so a failover or hedged answer is found under the secondary.
+    """
+    if LLM_CACHE_MODE not in ("record", "replay"):
+        return None
+    providers = _providers() or ["openai" if USE_OPENAI and OPENAI_API_KEY else "gemini"]
+    keys = []
+    for provider in providers:
+        model = _model(stage, provider)
+        keys.append(_cache_key(prompt, think, provider, model, schema, sample))
+        output = await llm_cache.aget(keys[-1])
+        if output is not None:
+            return output, model
+    if LLM_CACHE_MODE == "replay":
+        raise LLMCacheMiss(f"No recorded LLM response for key {keys[0][:16]}")
+    return None
+
+
+PROVIDER_NAMES = {"openai": "OpenAI", "gemini": "Gemini"}
+
+
+def _providers() -> List[str]:
+    """Configured providers, primary first; the other one is the failover/hedge target"""
+    primary, secondary = ("openai", "gemini") if USE_OPENAI and OPENAI_API_KEY else ("gemini", "openai")
+    keys = {"openai": OPENAI_API_KEY, "gemini": GEMINI_API_KEY}
+    providers = [p for p in (primary, secondary) if keys[p]]
+    return providers if LLM_FAILOVER else providers[:1]
+
+
+def _openai_params(prompt: str, model: str, schema: Optional[dict]) -> dict:
+    params = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.7,
+        "max_tokens": MAX_OUTPUT_TOKENS,
+    }
+    if schema:
+        params["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "response", "schema": schema, "strict": True}
+        }
+    return params
+
+
+def _gemini_schema(schema: dict) -> dict:
+    # Gemini's schema subset has no additionalProperties
+    if isinstance(schema, dict):
+        return {k: _gemini_schema(v) for k, v in schema.items() if k != "additionalProperties"}
+    return schema
+
+
+def _gemini_config(schema: Optional[dict]) -> dict:
+    if not schema:
+        return GEMINI_GENERATION_CONFIG
+    return {
+        **GEMINI_GENERATION_CONFIG,
+        "response_mime_type": "application/json",
+        "response_schema": _gemini_schema(schema),
+    }
+
+
+async def _arequest(provider: str, prompt: str, think: bool, model: str,
+                    schema: Optional[dict] = None) -> Tuple[str, Optional[Usage]]:
+    if provider == "openai":
+        response = await _acall("openai", prompt, lambda: _async_openai_client().chat.completions.create(
+            **_openai_params(prompt, model, schema)
+        ))
+        return _clean_output(response.choices[0].message.content), _usage(response)
+
+    response = await _acall("gemini", prompt, lambda: _async_gemini_model(model).generate_content_async(
+        _gemini_prompt(prompt, think), generation_config=_gemini_config(schema)
+    ))
+    return _clean_output(response.text), _usage(response)
+
+
+async def _aprompt_provider(prompt: str, think: bool, stage: Optional[str],
+                            schema: Optional[dict]) -> Tuple[str, Optional[Usage], str, Optional[str]]:
+    """
+    Try each provider in turn, failing over on errors; returns (text, usage,
+    model, provider). With LLM_HEDGE, a primary call still running
+    after its recent latency percentile is raced against the secondary
+    provider and the first answer wins; errors fail over immediately.
+    """
+    providers = _providers()
+    if not providers:
         logger.error("No API key available")
-        return ""
-    
+        return "", None, _model(stage), None
+
+    hedge_stats.count("requests")
+    waiting = list(providers)
+    running = {}  # task -> (provider, model, started)
+    hedged = False
+
+    def launch():
+        provider = waiting.pop(0)
+        model = _model(stage, provider)
+        task = asyncio.ensure_future(_arequest(provider, prompt, think, model, schema))
+        running[task] = (provider, model, time.monotonic())
+
+    launch()
     try:
-        import google.generativeai as genai
-        
-        # Match Ollama's generation config
-        generation_config = {
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "top_k": 40,
-            "max_output_tokens": 2048,
-        }
-        
-        model = genai.GenerativeModel(
-            GEMINI_MODEL,
-            generation_config=generation_config
-        )
-        
-        if not think:
-            prompt = "Respond directly without showing reasoning.\n\n" + prompt
-        
-        response = model.generate_content(prompt)
-        output = response.text.strip()
-        
-        # Handle thinking tags
-        if '<think>' in output[:50]:
-            output = output.split('</think>')[-1].strip()
-        
-        return output
-    except Exception as e:
-        logger.error(f"Gemini API error: {e}")
-        return ""
+        while running:
+            timeout = hedge_stats.delay(providers[0]) if LLM_HEDGE and waiting and not hedged else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.info(f"{PROVIDER_NAMES[providers[0]]} slower than {timeout:.1f}s, hedging")
+                hedge_stats.count("hedged")
+                hedged = True
+                launch()
+                continue
+
+            for task in done:
+                provider, model, started = running.pop(task)
+                try:
+                    text, usage = task.result()
+                except Exception as e:
+                    logger.error(f"{PROVIDER_NAMES[provider]} API error: {e}")
+                    if waiting:
+                        hedge_stats.count("failovers")
+                        launch()
+                    continue
+                hedge_stats.observe(provider, time.monotonic() - started)
+                hedge_stats.won(provider, hedged, primary=provider == providers[0])
+                return text, usage, model, provider
+    finally:
+        for task, (provider, _, started) in running.items():
+            task.cancel()
+            # An outrun call took at least this long; leaving it out would pull the hedge delay down
+            hedge_stats.observe(provider, time.monotonic() - started)
+
+    hedge_stats.count("failed")
+    return "", None, _model(stage), None
+
+
+async def aprompt_llm(prompt: str, think: bool = True, stage: Optional[str] = None,
+                      schema: Optional[dict] = None, sample: int = 0) -> str:
+    """
+    LLM wrapper matching original Ollama behavior
+    Supports both OpenAI and Gemini; stage selects the per-stage model,
+    schema requests JSON output matching a JSON schema, and sample numbers
+    independent draws of the same prompt for the response cache
+    """
+    cached = await _cached_output(prompt, think, stage, schema, sample)
+    if cached is not None:
+        record_usage(stage, cached[1], 0.0, None, cached=True, failed=False)
+        return cached[0]
+
+    start = time.monotonic()
+    output, usage, model, provider = await _aprompt_provider(prompt, think, stage, schema)
+    record_usage(stage, model, time.monotonic() - start, usage, cached=False, failed=not output)
+    if output and LLM_CACHE_MODE == "record":
+        # Under the provider that answered, which may be the failover/hedge target
+        await llm_cache.aset(_cache_key(prompt, think, provider, model, schema, sample), output)
+    return output
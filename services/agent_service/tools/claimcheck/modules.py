@@ -1,55 +1,169 @@
 """ClaimCheck modules - planning, summarization, synthesis, evaluation"""
-from .llm import prompt_llm
-from .prompts import PLAN_PROMPT, SUMMARIZE_PROMPT, DEVELOP_PROMPT, JUDGE_PROMPT
+import json
+import hashlib
+import logging
+from typing import Callable, Optional, Tuple, Union
+from .budget import estimate_tokens, fit_record
+from .cache import TieredCache
+from .config import CACHE_DB_PATH, SUMMARY_CACHE_TTL, SUMMARY_CACHE_SIZE, PROMPT_TOKEN_BUDGET
+from .ledger import EvidenceLedger
+from .llm import aprompt_llm
+from .prompts import PLAN_PROMPT, SUMMARIZE_PROMPT, DEVELOP_PROMPT, JUDGE_PROMPT, JUDGE_JSON_PROMPT
+from .relevance import select_evidence
+from .web_tools import canonical_url
 
+logger = logging.getLogger(__name__)
 
-def plan_searches(claim: str, record: str = "") -> str:
-    """Original ClaimCheck planning module"""
+# Summaries of unchanged evidence for the same claim, including "NONE" verdicts
+summary_cache = TieredCache(
+    "summaries",
+    max_entries=SUMMARY_CACHE_SIZE,
+    ttl=SUMMARY_CACHE_TTL,
+    db_path=CACHE_DB_PATH
+)
+
+Record = Union[str, EvidenceLedger]
+
+
+def _budgeted(build: Callable[[str], str], record: Record, measure: Optional[Callable[[str], str]] = None) -> str:
+    """
+    Build a prompt, compacting a ledger record so the prompt fits PROMPT_TOKEN_BUDGET.
+    measure builds the largest prompt the caller can produce (default: build), so
+    calls that differ only after the record compact it identically and keep a
+    common, provider-cacheable prefix.
+    """
+    if isinstance(record, str):
+        return build(record)
+    if PROMPT_TOKEN_BUDGET <= 0:
+        return build(record.render())
+    fixed_tokens = estimate_tokens((measure or build)(""))
+    return build(fit_record(record, max(PROMPT_TOKEN_BUDGET - fixed_tokens, 1)))
+
+
+def _plan_prompt(claim: str, record: Record) -> str:
     action_definitions = {
         "web_search": {
             "desc": "Run an open web search for related webpages.",
             "example": 'web_search("New Zealand Food Bill 2020")'
         }
     }
-    
+
     valid_actions = "\n".join([f"{a}: {action_definitions[a]['desc']}" for a in action_definitions])
     examples = "\n".join([f"{action_definitions[a]['example']}" for a in action_definitions])
-    
-    prompt = PLAN_PROMPT.format(
+
+    return _budgeted(lambda text: PLAN_PROMPT.format(
         valid_actions=valid_actions,
         examples=examples,
-        record=record,
+        record=text,
         claim=claim
-    )
-    
-    return prompt_llm(prompt, think=True)
+    ), record)
+
 
+RESULT_CHARS = 5000
 
-def summarize_evidence(claim: str, search_result: str, url: str, record: str) -> str:
-    """Original ClaimCheck evidence summarization"""
-    # Limit search result to avoid token limits
-    limited_result = search_result[:5000] if search_result else ""
-    
-    prompt = SUMMARIZE_PROMPT.format(
+
+def _limit_result(search_result: str, claim: str, query: str) -> Optional[str]:
+    # Limit search result to avoid token limits, keeping its most relevant parts (None = irrelevant)
+    return select_evidence(search_result, claim, query, budget=RESULT_CHARS)
+
+
+def _summary_key(claim: str, url: str, limited_result: str) -> str:
+    claim_fingerprint = hashlib.sha256(' '.join(claim.lower().split()).encode()).hexdigest()[:16]
+    content_hash = hashlib.sha256(limited_result.encode()).hexdigest()[:16]
+    return f"{claim_fingerprint}|{canonical_url(url)}|{content_hash}"
+
+
+def _summarize_prompt(claim: str, limited_result: str, url: str, record: Record) -> str:
+    return _budgeted(lambda text: SUMMARIZE_PROMPT.format(
         claim=claim,
         search_result=limited_result,
         url=url,
-        record=record
-    )
-    return prompt_llm(prompt, think=True)
+        record=text
+    ), record, measure=lambda text: SUMMARIZE_PROMPT.format(
+        claim=claim,
+        search_result=" " * RESULT_CHARS,
+        url=" " * 200,
+        record=text
+    ))
 
 
-def develop_reasoning(record: str) -> str:
-    """Original ClaimCheck evidence synthesis"""
-    prompt = DEVELOP_PROMPT.format(record=record)
-    return prompt_llm(prompt, think=True)
+def _develop_prompt(record: Record) -> str:
+    return _budgeted(lambda text: DEVELOP_PROMPT.format(record=text), record)
 
 
-def judge_verdict(record: str, decision_options: str, rules: str) -> str:
-    """Original ClaimCheck verdict judgment"""
-    prompt = JUDGE_PROMPT.format(
-        record=record,
+def _judge_prompt(record: Record, decision_options: str, rules: str, template: str = JUDGE_PROMPT) -> str:
+    return _budgeted(lambda text: template.format(
+        record=text,
         options=decision_options,
         rules=rules
+    ), record)
+
+
+def _judgement_schema(decision_options: str) -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string"},
+            "reasoning": {"type": "string"},
+            "verdict": {"type": "string", "enum": decision_options.split("|")},
+        },
+        "required": ["summary", "reasoning", "verdict"],
+        "additionalProperties": False,
+    }
+
+
+def _parse_judgement(output: str) -> Tuple[str, str]:
+    """(verdict, judgement in the text judge's backtick format); verdict is '' if the reply isn't valid JSON"""
+    try:
+        data = json.loads(output)
+    except ValueError:
+        return "", output
+    if not isinstance(data, dict):
+        return "", output
+    verdict = str(data.get("verdict", "")).strip()
+    return verdict, f"{data.get('summary', '')}\n\n{data.get('reasoning', '')} `{verdict}`"
+
+
+async def aplan_searches(claim: str, record: Record = "") -> str:
+    """Original ClaimCheck planning module"""
+    return await aprompt_llm(_plan_prompt(claim, record), think=True, stage="plan")
+
+
+async def asummarize_evidence(claim: str, search_result: str, url: str, record: Record, query: str = "") -> str:
+    """
+    Original ClaimCheck evidence summarization, memoized per (claim, URL, content).
+    Pages sharing too few terms with the claim and query are "NONE" without an LLM call.
+    """
+    limited_result = _limit_result(search_result, claim, query)
+    if limited_result is None:
+        logger.info(f"Skipping low-relevance page: {url}")
+        return "NONE"
+    key = _summary_key(claim, url, limited_result)
+    cached = await summary_cache.aget(key)
+    if cached is not None:
+        logger.info(f"Summary cache hit: {url}")
+        return cached
+
+    summary = await aprompt_llm(_summarize_prompt(claim, limited_result, url, record), think=True, stage="summarize")
+    if summary:  # Empty means the LLM call failed
+        await summary_cache.aset(key, summary)
+    return summary
+
+
+async def adevelop_reasoning(record: Record) -> str:
+    """Original ClaimCheck evidence synthesis"""
+    return await aprompt_llm(_develop_prompt(record), think=True, stage="develop")
+
+
+async def ajudge_verdict(record: Record, decision_options: str, rules: str, sample: int = 0) -> str:
+    """Original ClaimCheck verdict judgment"""
+    return await aprompt_llm(_judge_prompt(record, decision_options, rules), think=True, stage="judge", sample=sample)
+
+
+async def ajudge_structured(record: Record, decision_options: str, rules: str, sample: int = 0) -> Tuple[str, str]:
+    """Verdict judgment constrained by the provider to one of decision_options, returns (verdict, judgement)"""
+    output = await aprompt_llm(
+        _judge_prompt(record, decision_options, rules, JUDGE_JSON_PROMPT),
+        think=True, stage="judge", schema=_judgement_schema(decision_options), sample=sample
     )
-    return prompt_llm(prompt, think=True)
+    return _parse_judgement(output)
@@ -1,4 +1,11 @@
-"""Original ClaimCheck prompts - exact copies"""
+"""
+Original ClaimCheck prompts
+
+Static instructions (and the rules) come first and variable content last,
+ordered from most to least shared: claim, then record, then the evidence of
+a single call. Providers cache identical prompt prefixes, so calls for the
+same claim reuse everything up to the part that differs.
+"""
 
 # Planning prompt
 PLAN_PROMPT = """Instructions
@@ -24,10 +31,11 @@ Valid Actions:
 Examples:
 {examples}
 
+Claim: {claim}
+
 Record:
 {record}
 
-Claim: {claim}
 Your Actions:
 """
 
@@ -50,13 +58,13 @@ Try to filter out relevant information even if the Search Result is in a differe
 
 Claim: {claim}
 
+Record:
+{record}
+
 Evidence:
 {url}
 {search_result}
 
-Record:
-{record}
-
 
 Your Summary:
 """
@@ -117,3 +125,21 @@ Record:
 {record}
 Your Judgement:
 """
+
+JUDGE_JSON_PROMPT = """
+Instructions
+Determine the Claim's veracity by following these steps:
+1. Briefly summarize the key insights from the fact-check (see Record) in at most one paragraph.
+2. Write one paragraph about which one of the Decision Options applies best.
+Respond with a JSON object: "summary" holds step 1, "reasoning" holds step 2 and "verdict" holds the
+most appropriate decision option, spelled exactly as listed.
+
+Decision Options:
+{options}
+
+Rules:
+{rules}
+
+Record:
+{record}
+"""
@@ -0,0 +1,186 @@
+"""Provider rate limits - RPM/TPM token buckets and retry backoff for LLM calls"""
+import time
+import random
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from .config import (
+    OPENAI_RPM, OPENAI_TPM, GEMINI_RPM, GEMINI_TPM,
+    LLM_BACKOFF_BASE, LLM_BACKOFF_MAX
+)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously, holding at most `burst` (default: one minute's worth)"""
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.capacity = burst or per_minute
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` now, going into debt if needed; return seconds until the debt is repaid"""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)  # Oversized requests still get through, alone
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class ProviderLimiter:
+    """
+    Request and token buckets for one provider, shared by every thread and
+    event loop. Callers reserve capacity up front and sleep off any debt,
+    so under load they queue in reservation order instead of firing and
+    collecting 429s. A 429 halves the refill rate and pauses all callers
+    for the backoff delay; successes restore the rate gradually.
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: float):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._lock = threading.Lock()
+        self._scale = 1.0
+        self._paused_until = 0.0
+        self.calls = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self._requests:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            self.calls += 1
+            if wait > 0:
+                self.waited += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        if wait > 1:
+            logger.info(f"{self.name} rate limit: waiting {wait:.1f}s")
+        return wait
+
+    def _cancel(self, tokens: int):
+        with self._lock:
+            if self._requests:
+                self._requests.refund(1)
+            if self._tokens:
+                self._tokens.refund(tokens)
+
+    async def aacquire(self, tokens: int):
+        """Wait until the provider has room for one request of `tokens` tokens"""
+        wait = self._reserve(tokens)
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._cancel(tokens)
+            raise
+
+    def _set_scale(self, scale: float):
+        self._scale = scale
+        if self._requests:
+            self._requests.rate = self.rpm * scale / 60.0
+        if self._tokens:
+            self._tokens.rate = self.tpm * scale / 60.0
+
+    def succeeded(self, reserved: int, used: Optional[int]):
+        """Return unused reserved tokens and recover the rate after throttling"""
+        with self._lock:
+            if self._tokens and used is not None and used < reserved:
+                self._tokens.refund(reserved - used)
+            if self._scale < 1.0:
+                self._set_scale(min(1.0, self._scale + 0.05))
+
+    def failed(self, error: Exception, attempt: int) -> float:
+        """Record a retryable failure and return the delay before the next attempt"""
+        delay = backoff_delay(attempt, retry_after(error))
+        with self._lock:
+            self.retries += 1
+            if status_code(error) == 429:
+                self.throttled += 1
+                self._set_scale(max(0.1, self._scale * 0.5))
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rpm": self.rpm * self._scale if self.rpm > 0 else None,
+                "tpm": self.tpm * self._scale if self.tpm > 0 else None,
+                "calls": self.calls,
+                "waited": self.waited,
+                "avg_wait_s": self.total_wait / self.calls if self.calls else 0.0,
+                "max_wait_s": self.max_wait,
+                "total_wait_s": self.total_wait,
+                "throttled": self.throttled,
+                "retries": self.retries,
+            }
+
+
+def status_code(error: Exception) -> Optional[int]:
+    # openai errors carry status_code, google.api_core errors carry code
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: Exception, transient: tuple = ()) -> bool:
+    """429s, 5xx, request timeouts and the provider's connection errors are worth retrying"""
+    status = status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return isinstance(error, (asyncio.TimeoutError, *transient))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds requested by the Retry-After (or retry-after-ms) header, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, hinted: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's hint"""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+    return max(delay, hinted) if hinted is not None else delay
+
+
+limiters: Dict[str, ProviderLimiter] = {
+    "openai": ProviderLimiter("openai", OPENAI_RPM, OPENAI_TPM),
+    "gemini": ProviderLimiter("gemini", GEMINI_RPM, GEMINI_TPM),
+}
+
+
+def limiter_stats() -> Dict[str, dict]:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,112 @@
+"""Lexical relevance pre-filter - BM25 window selection before summarization"""
+import re
+import math
+import logging
+import collections
+from typing import List, Optional
+
+from .budget import STOPWORDS
+from .config import RELEVANCE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+WINDOW_CHARS = 500
+GAP = "\n[...]\n"
+
+relevance_stats = collections.Counter()
+
+
+def tokens(text: str) -> List[str]:
+    return [t for t in re.findall(r"\w+", text.lower()) if len(t) > 2 and t not in STOPWORDS]
+
+
+def _pieces(sentence: str, size: int):
+    # Cut overlong sentences (tables, menus) at spaces
+    while len(sentence) > size:
+        cut = sentence.rfind(" ", 0, size)
+        cut = cut if cut > 0 else size
+        yield sentence[:cut]
+        sentence = sentence[cut:].lstrip()
+    if sentence:
+        yield sentence
+
+
+def windows(text: str, size: int = WINDOW_CHARS) -> List[str]:
+    """Split page text into consecutive windows of whole sentences, about `size` characters each"""
+    result, current = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+", text):
+        for piece in _pieces(sentence, size):
+            if current and len(current) + len(piece) + 1 > size:
+                result.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        result.append(current)
+    return result
+
+
+def bm25(docs: List[List[str]], query: set, k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 of each tokenized doc, with IDF taken over `docs` themselves"""
+    if not docs:
+        return []
+    avgdl = sum(len(d) for d in docs) / len(docs) or 1.0
+    df = collections.Counter(t for d in docs for t in set(d) if t in query)
+    idf = {t: math.log(1 + (len(docs) - n + 0.5) / (n + 0.5)) for t, n in df.items()}
+
+    scores = []
+    for doc in docs:
+        tf = collections.Counter(t for t in doc if t in query)
+        norm = k1 * (1 - b + b * len(doc) / avgdl)
+        scores.append(sum(idf[t] * f * (k1 + 1) / (f + norm) for t, f in tf.items()))
+    return scores
+
+
+def select_evidence(text: str, claim: str, query: str = "", budget: int = 5000) -> Optional[str]:
+    """
+    The parts of a page worth summarizing, or None when the page mentions
+    too few of the claim and query terms (RELEVANCE_THRESHOLD) to be worth
+    an LLM call. Pages over `budget` characters are cut down to their best
+    BM25 windows plus neighbouring context, kept in page order.
+    """
+    if not text:
+        return ""
+
+    query_terms = set(tokens(claim)) | set(tokens(query))
+    parts = windows(text)
+    docs = [tokens(w) for w in parts]
+
+    if query_terms and RELEVANCE_THRESHOLD > 0:
+        coverage = len(query_terms & set().union(*docs)) / len(query_terms)
+        if coverage < RELEVANCE_THRESHOLD:
+            relevance_stats["skipped"] += 1
+            logger.info(f"Page covers {coverage:.0%} of claim terms, below threshold")
+            return None
+
+    relevance_stats["kept"] += 1
+    if len(text) <= budget:
+        return text
+
+    scores = bm25(docs, query_terms)
+    if not any(scores):
+        return text[:budget]
+
+    def rank(i):
+        neighbours = max(scores[i - 1] if i else 0.0, scores[i + 1] if i + 1 < len(scores) else 0.0)
+        return scores[i], neighbours, -i
+
+    # Matching windows first, then their neighbours as context; windows with neither are dropped
+    candidates = [i for i in range(len(parts)) if any(rank(i)[:2])]
+    chosen, used = [], 0
+    for i in sorted(candidates, key=rank, reverse=True):
+        cost = len(parts[i]) + len(GAP)
+        if used + cost <= budget:
+            chosen.append(i)
+            used += cost
+
+    chosen.sort()
+    selected = parts[chosen[0]]
+    for previous, i in zip(chosen, chosen[1:]):
+        selected += (" " if i == previous + 1 else GAP) + parts[i]
+    relevance_stats["trimmed"] += 1
+    return selected[:budget]
@@ -0,0 +1,197 @@
+"""Process-wide bounded I/O scheduler for ClaimCheck work"""
+import time
+import asyncio
+import logging
+import weakref
+import threading
+import collections
+import concurrent.futures
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+
+from .config import (
+    SEARCH_CONCURRENCY, SCRAPE_CONCURRENCY, LLM_CONCURRENCY, BLOCKING_WORKERS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop, future):
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class Lane:
+    """
+    FIFO slot pool shared by any number of event loops. asyncio.Semaphore
+    is bound to one loop, but sync wrappers run their own loops, on other
+    threads, so the limit has to live outside asyncio.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+        self._active = 0
+        self._acquired = 0
+        self._max_queued = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _try_acquire(self) -> bool:
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return True
+        return False
+
+    def _enqueue(self, waiter: _Waiter):
+        self._waiters.append(waiter)
+        self._max_queued = max(self._max_queued, len(self._waiters))
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self._acquired += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def _release_locked(self):
+        # Hand the slot straight to the next waiter so FIFO order holds
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            try:
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+                return
+            except RuntimeError:
+                continue  # Loop closed, waiter is gone
+        self._active -= 1
+
+    async def aacquire(self):
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                waiter = None
+            else:
+                waiter = _Waiter(loop=loop, future=loop.create_future())
+                self._enqueue(waiter)
+        if waiter:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter.granted:
+                        self._release_locked()
+                    else:
+                        self._waiters.remove(waiter)
+                raise
+        self._record_wait(time.monotonic() - start)
+
+    def release(self):
+        with self._lock:
+            self._release_locked()
+
+    @asynccontextmanager
+    async def aslot(self):
+        await self.aacquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "active": self._active,
+                "queued": len(self._waiters),
+                "max_queued": self._max_queued,
+                "acquired": self._acquired,
+                "avg_wait_s": self._total_wait / self._acquired if self._acquired else 0.0,
+                "max_wait_s": self._max_wait,
+            }
+
+
+class IOScheduler:
+    """Shared limits for search, scrape and LLM calls plus one blocking-work pool"""
+
+    def __init__(self, limits: Dict[str, int], blocking_workers: int):
+        self.lanes = {name: Lane(name, limit) for name, limit in limits.items()}
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=blocking_workers,
+            thread_name_prefix="claimcheck"
+        )
+        self._resources_lock = threading.Lock()
+        self._loop_resources = weakref.WeakKeyDictionary()
+
+    def loop_resource(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Object created once per running event loop (async HTTP clients hold
+        loop-bound connections, so they cannot be shared across loops)
+        """
+        loop = asyncio.get_running_loop()
+        with self._resources_lock:
+            resources = self._loop_resources.setdefault(loop, {})
+            if name not in resources:
+                resources[name] = factory()
+            return resources[name]
+
+    async def aclose_loop_resources(self):
+        """Close this loop's resources while the loop can still run their cleanup"""
+        with self._resources_lock:
+            resources = self._loop_resources.pop(asyncio.get_running_loop(), {})
+        for name, resource in resources.items():
+            close = getattr(resource, "aclose", None) or getattr(resource, "close", None)
+            if not close:
+                continue
+            try:
+                result = close()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Closing {name} failed: {e}")
+
+    def run(self, coro: Awaitable):
+        """
+        asyncio.run that closes the loop's pooled clients before the loop goes
+        away. Called from a thread that already runs a loop (blocking code in
+        an async app), the coroutine gets its own loop on a separate thread.
+        """
+        async def main():
+            try:
+                return await coro
+            finally:
+                await self.aclose_loop_resources()
+
+        try:
+            asyncio.get_running_loop()
+            in_loop = True
+        except RuntimeError:
+            in_loop = False
+        if not in_loop:
+            return asyncio.run(main())
+        # Not self.executor: its workers may be the ones this coroutine waits for
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="claimcheck-run") as runner:
+            return runner.submit(asyncio.run, main()).result()
+
+    def aslot(self, kind: str):
+        return self.lanes[kind].aslot()
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+
+scheduler = IOScheduler(
+    {"search": SEARCH_CONCURRENCY, "scrape": SCRAPE_CONCURRENCY, "llm": LLM_CONCURRENCY},
+    blocking_workers=BLOCKING_WORKERS
+)
@@ -0,0 +1,109 @@
+"""LLM usage accounting - latency, tokens and estimated cost per stage and per claim"""
+import logging
+import threading
+import collections
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from .config import MODEL_PRICES
+
+logger = logging.getLogger(__name__)
+
+
+# (prompt_tokens, completion_tokens, cached_prompt_tokens) as reported by the provider
+Usage = Tuple[int, int, int]
+
+
+def estimate_cost(model: str, usage: Optional[Usage]) -> float:
+    """USD for a call's usage at MODEL_PRICES, 0 for unpriced models"""
+    prices = MODEL_PRICES.get(model)
+    if not usage or not prices:
+        return 0.0
+    prompt_tokens, completion_tokens, cached_tokens = usage
+    input_price, output_price = prices[0], prices[1]
+    cached_price = prices[2] if len(prices) > 2 else input_price
+    return ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+            + completion_tokens * output_price) / 1_000_000
+
+
+class StageStats:
+    """Counters per ClaimCheck stage, process-wide or for one claim"""
+
+    def __init__(self, claim_id: Optional[str] = None):
+        self.claim_id = claim_id
+        self._lock = threading.Lock()
+        self._stages = collections.defaultdict(collections.Counter)
+        self._models: Dict[str, str] = {}
+        self._max_latency: Dict[str, float] = collections.defaultdict(float)
+
+    def record(self, stage: str, model: str, latency: float,
+               usage: Optional[Usage], cached: bool, failed: bool, cost: float = 0.0):
+        with self._lock:
+            counters = self._stages[stage]
+            counters["calls"] += 1
+            counters["cache_hits"] += cached
+            counters["errors"] += failed
+            if usage:
+                counters["prompt_tokens"] += usage[0]
+                counters["completion_tokens"] += usage[1]
+                counters["cached_tokens"] += usage[2]
+            counters["cost_usd"] += cost
+            if not cached:
+                counters["provider_calls"] += 1
+                counters["latency_s"] += latency
+                self._max_latency[stage] = max(self._max_latency[stage], latency)
+            self._models[stage] = model
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            result = {}
+            for stage, counters in self._stages.items():
+                provider_calls = counters["provider_calls"]
+                result[stage] = {
+                    "model": self._models.get(stage),
+                    "calls": counters["calls"],
+                    "cache_hits": counters["cache_hits"],
+                    "errors": counters["errors"],
+                    "avg_latency_s": counters["latency_s"] / provider_calls if provider_calls else 0.0,
+                    "max_latency_s": self._max_latency[stage],
+                    "total_latency_s": counters["latency_s"],
+                    "prompt_tokens": counters["prompt_tokens"],
+                    "completion_tokens": counters["completion_tokens"],
+                    "cached_tokens": counters["cached_tokens"],
+                    "cached_share": counters["cached_tokens"] / counters["prompt_tokens"] if counters["prompt_tokens"] else 0.0,
+                    "cost_usd": round(counters["cost_usd"], 6),
+                }
+            return result
+
+    def summary(self) -> dict:
+        """Totals across stages plus the per-stage breakdown"""
+        stages = self.snapshot()
+        totals = {
+            key: sum(stage[key] for stage in stages.values())
+            for key in ("calls", "cache_hits", "errors", "prompt_tokens", "completion_tokens",
+                        "cached_tokens", "total_latency_s")
+        }
+        totals["cached_share"] = totals["cached_tokens"] / totals["prompt_tokens"] if totals["prompt_tokens"] else 0.0
+        totals["cost_usd"] = round(sum(stage["cost_usd"] for stage in stages.values()), 6)
+        if self.claim_id:
+            totals["claim_id"] = self.claim_id
+        return {**totals, "stages": stages}
+
+
+stage_stats = StageStats()
+
+# Usage of the claim being verified in the current task; asyncio tasks inherit it
+claim_usage: ContextVar[Optional[StageStats]] = ContextVar("claimcheck_claim_usage", default=None)
+
+
+def record_usage(stage: Optional[str], model: str, latency: float,
+                 usage: Optional[Usage], cached: bool, failed: bool):
+    """Account one aprompt_llm call to the process counters and to the current claim"""
+    stage = stage or "other"
+    cost = estimate_cost(model, usage)
+    stage_stats.record(stage, model, latency, usage, cached, failed, cost)
+
+    claim = claim_usage.get()
+    if claim:
+        claim.record(stage, model, latency, usage, cached, failed, cost)
+        logger.debug(f"[{claim.claim_id}] {stage} {model}: {usage} tokens, {latency:.2f}s, ${cost:.5f}")
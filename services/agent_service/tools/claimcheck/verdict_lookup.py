@@ -0,0 +1,199 @@
+"""Near-duplicate lookup of recently stored verdicts, checked before running ClaimCheck"""
+import re
+import json
+import time
+import asyncio
+import logging
+import threading
+import collections
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import VERDICT_LOOKUP_WINDOW_HOURS, VERDICT_LOOKUP_THRESHOLD, VERDICT_LOOKUP_REFRESH
+from .scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+NEGATIONS = {"no", "not", "never", "none", "nobody", "nothing", "neither", "nor", "without"}
+
+
+def normalize_claim(claim: str) -> str:
+    text = re.sub(r"[^\w\s%.]", " ", claim.lower())
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)  # Keep decimal points only
+    return ' '.join(text.split())
+
+
+def _trigrams(text: str) -> frozenset:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _guard_tokens(text: str) -> frozenset:
+    # Numbers and negations flip a verdict while barely moving trigram similarity
+    return frozenset(t for t in text.split() if t in NEGATIONS or any(c.isdigit() for c in t))
+
+
+class _Entry:
+    __slots__ = ("claim", "result", "verified_at", "cutoff", "trigrams", "guards")
+
+    def __init__(self, claim: str, result: dict, verified_at: float, cutoff: Optional[str] = None):
+        normalized = normalize_claim(claim)
+        self.claim = claim
+        self.result = result
+        self.verified_at = verified_at
+        self.cutoff = cutoff  # Search date the caller asked for; None means as of verified_at
+        self.trigrams = _trigrams(normalized)
+        self.guards = _guard_tokens(normalized)
+
+
+class VerdictIndex:
+    """
+    In-memory trigram index over verdicts stored within the freshness window.
+    Rows come from a loader (wired to crawled_content by the agent) and from
+    verifications finished by this process.
+
+    A verdict only answers requests with the same search cutoff date: one
+    built from evidence up to today must not stand in for an earlier cutoff,
+    nor an old cutoff for a current check. Loaded rows have no cutoff.
+    """
+
+    def __init__(self, window_hours: float, threshold: float, refresh_interval: float):
+        self.window = window_hours * 3600
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self._loader: Optional[Callable[[datetime], List[dict]]] = None
+        self._lock = threading.Lock()
+        self._entries: List[_Entry] = []
+        self._exact: Dict[Tuple[str, Optional[str]], _Entry] = {}
+        self._postings: Dict[str, List[_Entry]] = collections.defaultdict(list)
+        self._loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def set_loader(self, loader: Callable[[datetime], List[dict]]):
+        """loader(since) returns rows with claim, verification_status, confidence, evidence, verification_sources, updated_at"""
+        self._loader = loader
+        self._loaded_at = 0.0
+
+    def _index(self, entry: _Entry):
+        self._entries.append(entry)
+        self._exact[normalize_claim(entry.claim), entry.cutoff] = entry
+        for gram in entry.trigrams:
+            self._postings[gram].append(entry)
+
+    def _rebuild(self, entries: List[_Entry]):
+        self._entries = []
+        self._exact = {}
+        self._postings = collections.defaultdict(list)
+        for entry in sorted(entries, key=lambda e: e.verified_at):
+            self._index(entry)
+
+    def refresh(self, force: bool = False):
+        """Reload rows from the loader once refresh_interval has passed"""
+        now = time.time()
+        if not self.enabled or (not force and now - self._loaded_at < self.refresh_interval):
+            return
+        self._loaded_at = now
+
+        rows = []
+        if self._loader:
+            try:
+                rows = self._loader(datetime.utcnow() - timedelta(seconds=self.window))
+            except Exception as e:
+                logger.error(f"Verdict lookup refresh failed: {e}")
+
+        entries = [_row_to_entry(row) for row in rows]
+        with self._lock:
+            local = [e for e in self._entries if e.verified_at > now - self.window]
+            self._rebuild([e for e in entries if e] + local)
+        logger.info(f"Verdict index refreshed with {len(self._entries)} claims")
+
+    def add(self, claim: str, result: dict, cutoff: Optional[str] = None):
+        """Index a verdict produced by this process for the search date `cutoff` (None: today's)"""
+        if self.enabled:
+            with self._lock:
+                self._index(_Entry(claim, result, time.time(), cutoff))
+
+    def _match(self, claim: str, date: Optional[str]) -> Optional[tuple]:
+        normalized = normalize_claim(claim)
+        oldest = time.time() - self.window
+
+        with self._lock:
+            exact = self._exact.get((normalized, date))
+            if exact and exact.verified_at > oldest:
+                return exact, 1.0
+
+            grams = _trigrams(normalized)
+            guards = _guard_tokens(normalized)
+            overlaps = collections.Counter()
+            for gram in grams:
+                overlaps.update(self._postings.get(gram, ()))
+
+        best = None
+        for entry, overlap in overlaps.items():
+            if entry.verified_at <= oldest or entry.cutoff != date or entry.guards != guards:
+                continue
+            similarity = overlap / (len(grams) + len(entry.trigrams) - overlap)
+            if similarity >= self.threshold and (not best or similarity > best[1]):
+                best = (entry, similarity)
+        return best
+
+    async def alookup(self, claim: str, date: Optional[str] = None) -> Optional[dict]:
+        """Return the stored result for a near-duplicate claim checked with the same search date, or None"""
+        if not self.enabled:
+            return None
+        # The loader hits the database, keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(scheduler.executor, self.refresh)
+        return self._result(claim, self._match(claim, date))
+
+    def _result(self, claim: str, match: Optional[tuple]) -> Optional[dict]:
+        if not match:
+            self.misses += 1
+            return None
+        entry, similarity = match
+        self.hits += 1
+        logger.info(f"Verdict cache hit ({similarity:.2f}): '{claim[:50]}' ~ '{entry.claim[:50]}'")
+        return {
+            **entry.result,
+            "claim": claim,
+            "cache_hit": True,
+            "matched_claim": entry.claim,
+            "similarity": round(similarity, 3),
+        }
+
+    def stats(self) -> dict:
+        return {"claims": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def _row_to_entry(row: dict) -> Optional[_Entry]:
+    if not row.get("claim") or not row.get("verification_status"):
+        return None
+    sources = row.get("verification_sources") or []
+    if isinstance(sources, str):
+        sources = json.loads(sources)
+    updated_at = row.get("updated_at")
+    if isinstance(updated_at, str):
+        updated_at = datetime.fromisoformat(updated_at)
+    if updated_at and updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)  # Stored as utcnow()
+    verified_at = updated_at.timestamp() if updated_at else time.time()
+
+    return _Entry(row["claim"], {
+        "claim": row["claim"],
+        "verification_status": row["verification_status"],
+        "confidence": row.get("confidence") or 0,
+        "evidence": row.get("evidence") or "",
+        "sources": sources,
+        "reasoning": "Previously verified near-identical claim"
+    }, verified_at)
+
+
+verdict_index = VerdictIndex(
+    window_hours=VERDICT_LOOKUP_WINDOW_HOURS,
+    threshold=VERDICT_LOOKUP_THRESHOLD,
+    refresh_interval=VERDICT_LOOKUP_REFRESH
+)
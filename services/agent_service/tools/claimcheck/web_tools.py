@@ -1,96 +1,266 @@
 """Web search and scraping tools"""
 import json
+import time
+import asyncio
 import logging
-import requests
-import concurrent.futures
-from typing import Optional, List, Tuple
+import collections
+from typing import Dict, Iterator, Optional, List, Tuple
 from datetime import datetime
-from bs4 import BeautifulSoup
-from .config import SERPER_API_KEY
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from .config import (
+    SERPER_API_KEY, CACHE_DB_PATH, SEARCH_CACHE_TTL, SEARCH_CACHE_SIZE, SEARCH_BATCH_SIZE,
+    PAGE_CACHE_SIZE, PAGE_CACHE_MAX_BYTES, PAGE_REVALIDATE_AFTER
+)
+from .cache import TieredCache
+from .extraction import get_extractor
+from .fetching import page_fetcher, UnsupportedContent, _asend
+from .scheduler import scheduler
 
 logger = logging.getLogger(__name__)
 
+SERPER_URL = "https://google.serper.dev/search"
+SERPER_TIMEOUT = 10
+SERPER_BATCH_TIMEOUT = 30  # A batch of queries is answered as a whole
+SCRAPE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+}
 
-def web_search(query: str, date: str, top_k: int = 3) -> Tuple[List[str], List[str]]:
+search_cache = TieredCache(
+    "search",
+    max_entries=SEARCH_CACHE_SIZE,
+    ttl=SEARCH_CACHE_TTL,
+    db_path=CACHE_DB_PATH
+)
+
+# Extracted page text plus validators, revalidated with conditional GETs
+page_cache = TieredCache(
+    "pages",
+    max_entries=PAGE_CACHE_SIZE,
+    db_path=CACHE_DB_PATH,
+    max_bytes=PAGE_CACHE_MAX_BYTES
+)
+page_stats = collections.Counter()
+extractor = get_extractor()
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid"}
+
+
+def normalize_query(query: str) -> str:
+    return ' '.join(query.lower().split())
+
+
+def canonical_url(url: str) -> str:
+    """Normalize scheme/host case, default ports, fragments and tracking params"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        netloc = f"{netloc}:{parts.port}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def _serper_date(date: str) -> str:
+    # Format date for Serper API
+    return datetime.strptime(date, "%d-%m-%Y").strftime('%d/%m/%Y')
+
+
+def _search_cache_key(query: str, date: str, top_k: int) -> str:
+    return f"{normalize_query(query)}|{_serper_date(date)}|{top_k}"
+
+
+def _serper_query(query: str, date: str, top_k: int) -> dict:
+    return {
+        "q": query,
+        "num": top_k,
+        "tbs": f"cdr:1,cd_min:1/1/1900,cd_max:{_serper_date(date)}"
+    }
+
+
+def _serper_headers() -> dict:
+    return {
+        'X-API-KEY': SERPER_API_KEY,
+        'Content-Type': 'application/json'
+    }
+
+
+def _parse_serper(results: dict, top_k: int) -> Tuple[List[str], List[str]]:
+    urls = []
+    snippets = []
+
+    for item in results.get("organic", []):
+        if len(urls) >= top_k:
+            break
+        link = item.get("link", "")
+        if link and not link.endswith("pdf"):
+            urls.append(link)
+            snippets.append(item.get("snippet", ""))
+
+    return urls, snippets
+
+
+async def _cached_search(key: str) -> Optional[Tuple[List[str], List[str]]]:
+    cached = await search_cache.aget(key)
+    return (cached[0], cached[1]) if cached else None
+
+
+async def _plan_searches(queries: List[str], date: str, top_k: int):
     """
-    Original ClaimCheck web search using Serper API
-    Returns: (urls, snippets)
+    Cache lookups for a list of queries. Returns (cache keys, results found
+    in search_cache or None, {cache key: query} still to send); queries
+    differing only in case or spacing are sent once.
+    """
+    keys = [_search_cache_key(query, date, top_k) for query in queries]
+    results = await asyncio.gather(*(_cached_search(key) for key in keys))
+    missing = {}
+    for key, query, cached in zip(keys, queries, results):
+        if cached is None:
+            missing.setdefault(key, query)
+    return keys, results, missing
+
+
+def _serper_batches(missing: Dict[str, str], date: str, top_k: int) -> Iterator[Tuple[List[str], str]]:
+    """(cache keys, request body) per SEARCH_BATCH_SIZE queries; a lone query is sent as a plain object"""
+    keys = list(missing)
+    for start in range(0, len(keys), SEARCH_BATCH_SIZE):
+        chunk = keys[start:start + SEARCH_BATCH_SIZE]
+        queries = [_serper_query(missing[key], date, top_k) for key in chunk]
+        yield chunk, json.dumps(queries[0] if len(queries) == 1 else queries)
+
+
+async def _read_serper(status: int, data, chunk: List[str], top_k: int, found: dict):
+    """Split a (batched) Serper response back into per-query results, cached under their keys"""
+    if status != 200:
+        logger.error(f"Serper API error: {status}")
+        return
+    items = data if isinstance(data, list) else [data]
+    if len(items) != len(chunk):
+        logger.error(f"Serper returned {len(items)} results for {len(chunk)} queries")
+        return
+    for key, item in zip(chunk, items):
+        results = _parse_serper(item, top_k)
+        found[key] = results
+        await search_cache.aset(key, list(results))
+
+
+def _collect(keys: List[str], results: list, found: dict) -> List[Tuple[List[str], List[str]]]:
+    return [cached if cached is not None else found.get(key, ([], [])) for key, cached in zip(keys, results)]
+
+
+async def _cached_page(url: str) -> Tuple[str, Optional[dict], bool]:
+    """Returns (cache key, cached entry, whether it is fresh enough to skip revalidation)"""
+    key = canonical_url(url)
+    found = await page_cache.aget_entry(key)
+    if not found:
+        return key, None, False
+    entry, stored_at = found
+    return key, entry, time.time() - stored_at < PAGE_REVALIDATE_AFTER
+
+
+def _conditional_headers(entry: Optional[dict]) -> dict:
+    headers = dict(SCRAPE_HEADERS)
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+async def _store_page(key: str, text: str, headers) -> None:
+    page_stats["fetched"] += 1
+    await page_cache.aset(key, {
+        "text": text,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified")
+    })
+
+
+async def _not_modified(key: str, entry: dict) -> str:
+    page_stats["revalidated"] += 1
+    await page_cache.aset(key, entry)  # Restart the revalidation clock
+    return entry["text"]
+
+
+def _extract_text(content: bytes) -> str:
+    return extractor.extract(content)
+
+
+async def asearch_many(queries: List[str], date: str, top_k: int = 3) -> List[Tuple[List[str], List[str]]]:
+    """
+    Serper results for several queries, e.g. all web_search actions of one
+    planning round. Cached queries come from search_cache, the rest are sent
+    as one batched POST per SEARCH_BATCH_SIZE queries, concurrently, and
+    split back out. Returns (urls, snippets) per query, in order; empty for
+    failed queries.
     """
     if not SERPER_API_KEY:
         logger.warning("SERPER_API_KEY not set")
-        return [], []
-    
+        return [([], []) for _ in queries]
+
     try:
-        # Format date for Serper API
-        end_date = datetime.strptime(date, "%d-%m-%Y").strftime('%d/%m/%Y')
-        
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({
-            "q": query,
-            "num": top_k,
-            "tbs": f"cdr:1,cd_min:1/1/1900,cd_max:{end_date}"
-        })
-        headers = {
-            'X-API-KEY': SERPER_API_KEY,
-            'Content-Type': 'application/json'
-        }
-        
-        response = requests.post(url, headers=headers, data=payload, timeout=10)
-        
-        if response.status_code == 200:
-            results = response.json()
-            urls = []
-            snippets = []
-            
-            for item in results.get("organic", []):
-                if len(urls) >= top_k:
-                    break
-                link = item.get("link", "")
-                if link and not link.endswith("pdf"):
-                    urls.append(link)
-                    snippets.append(item.get("snippet", ""))
-            
-            return urls, snippets
-        else:
-            logger.error(f"Serper API error: {response.status_code}")
-            return [], []
-    
+        keys, results, missing = await _plan_searches(queries, date, top_k)
     except Exception as e:
         logger.error(f"Web search failed: {e}")
-        return [], []
+        return [([], []) for _ in queries]
 
+    found = {}
+
+    async def send(chunk: List[str], body: str):
+        try:
+            async with scheduler.aslot("search"):
+                response = await _asend(
+                    "search", "POST", SERPER_URL,
+                    headers=_serper_headers(),
+                    content=body,
+                    timeout=SERPER_TIMEOUT if len(chunk) == 1 else SERPER_BATCH_TIMEOUT
+                )
+            await _read_serper(response.status_code, response.json() if response.status_code == 200 else None,
+                               chunk, top_k, found)
+        except Exception as e:
+            logger.error(f"Web search failed: {e}")
 
-def scrape_url_content(url: str) -> Optional[str]:
+    await asyncio.gather(*(send(chunk, body) for chunk, body in _serper_batches(missing, date, top_k)))
+    return _collect(keys, results, found)
+
+
+async def ascrape_url_content(url: str) -> Optional[str]:
     """
-    Original ClaimCheck web scraper
-    Returns scraped content or None
+    Original ClaimCheck web scraper, returns the page text, "Unable to
+    Scrape" on timeout (the request is cancelled) or None
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    }
-    
-    def _scrape():
-        try:
-            page = requests.get(url, headers=headers, timeout=15)
-            if page.status_code in [403, 404]:
-                return None
-            page.raise_for_status()
-            
-            soup = BeautifulSoup(page.content, 'html.parser')
-            if soup.article:
-                soup = soup.article
-            
-            text = soup.get_text(separator=' ', strip=True)
-            text = ' '.join(text.split())  # Clean whitespace
-            return text
-        except Exception:
-            return None
-    
-    # Execute with timeout (original uses 15s)
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(_scrape)
-        try:
-            result = future.result(timeout=15)
-            return result if result else None
-        except concurrent.futures.TimeoutError:
-            return "Unable to Scrape"
+    key, entry, fresh = await _cached_page(url)
+    if fresh:
+        page_stats["fresh"] += 1
+        return entry["text"]
+
+    try:
+        status, headers, content = await page_fetcher.afetch(url, _conditional_headers(entry))
+    except UnsupportedContent as e:
+        logger.info(f"Skipping {e}")
+        page_stats["rejected"] += 1
+        return None
+    except asyncio.TimeoutError:
+        return entry["text"] if entry else "Unable to Scrape"
+    except Exception:
+        return entry["text"] if entry else None
+
+    if status == 304 and entry:
+        return await _not_modified(key, entry)
+    if status in [403, 404]:
+        await page_cache.adelete(key)
+        return None
+    if status >= 400:
+        return entry["text"] if entry else None
+
+    try:
+        # Parsing is CPU-bound; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(scheduler.executor, _extract_text, content)
+    except Exception:
+        return None
+    if text:
+        await _store_page(key, text, headers)
+    return text if text else None